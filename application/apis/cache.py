@@ -0,0 +1,336 @@
+"""キャッシュ用のモジュール.
+
+キャッシュの保存先(バックエンド)はCACHE_BACKENDで切り替える。
+- memory: プロセス内(ワーカーごと)に保持する
+- redis: Redis互換のプロトコル(RESP)を話すサーバーに保持し、ワーカー・ノード間で共有する
+
+値は名前空間(本文・目次・小説情報など)ごとにシリアライズ方法と有効期限を持つ。
+"""
+import asyncio
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+from config.environment import cache_settings
+
+
+@dataclass
+class CacheStats:
+    """キャッシュの利用状況(メトリクス)."""
+
+    hits: int = 0
+    """ヒット数"""
+    misses: int = 0
+    """ミス数"""
+    errors: int = 0
+    """バックエンドとの通信エラー数"""
+
+    @property
+    def hit_ratio(self) -> float:
+        """ヒット率."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class CacheBackend(ABC):
+    """キャッシュの保存先の基底クラス."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        """キーに対応する値を返却(無い場合・期限切れの場合はNone)."""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        """キーに値を設定(ttlは有効期限の秒数)."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """キーに対応する値を削除."""
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        """有効期限内の値を保持しているかどうか."""
+
+    async def close(self) -> None:
+        """保存先との接続を解放."""
+
+
+class MemoryBackend(CacheBackend):
+    """件数の上限(LRU)と有効期限を持つプロセス内の保存先."""
+
+    def __init__(self, maxsize: int):
+        """初期化."""
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, Tuple[float, bytes]] = OrderedDict()
+
+    def __len__(self) -> int:
+        """保持している件数."""
+        return len(self._entries)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """キーに対応する値を返却(無い場合・期限切れの場合はNone)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        """キーに値を設定(ttlは有効期限の秒数)."""
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        """キーに対応する値を削除."""
+        self._entries.pop(key, None)
+
+    async def exists(self, key: str) -> bool:
+        """有効期限内の値を保持しているかどうか."""
+        entry = self._entries.get(key)
+        return entry is not None and entry[0] > time.monotonic()
+
+
+class RedisError(Exception):
+    """Redis互換サーバーがエラーを返した場合の例外."""
+
+
+class RedisBackend(CacheBackend):
+    """Redis互換のプロトコル(RESP)を話すサーバーを保存先とするクラス.
+
+    接続はプールして使い回し、同時接続数はpool_sizeまでとする。
+    """
+
+    def __init__(self, url: str, pool_size: int, timeout: float):
+        """初期化.
+
+        引数:
+            url (str): 接続先(redis://[:password@]host[:port][/db])。
+            pool_size (int): 同時接続数の上限。
+            timeout (float): 接続・応答のタイムアウト(秒)。
+        """
+        parsed = urlsplit(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(pool_size)
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+
+    @staticmethod
+    def _encode(args: Tuple[Any, ...]) -> bytes:
+        chunks = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            chunks.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(chunks)
+
+    @classmethod
+    async def _read(cls, reader: asyncio.StreamReader) -> Any:
+        line = await reader.readline()
+        if not line:
+            raise ConnectionError("接続が切断されました")
+        prefix, data = line[:1], line[1:-2]
+        if prefix == b"+":
+            return data
+        if prefix == b"-":
+            raise RedisError(data.decode())
+        if prefix == b":":
+            return int(data)
+        if prefix == b"$":
+            length = int(data)
+            if length < 0:
+                return None
+            return (await reader.readexactly(length + 2))[:-2]
+        if prefix == b"*":
+            length = int(data)
+            if length < 0:
+                return None
+            return [await cls._read(reader) for _ in range(length)]
+        raise RedisError(f"不明な応答です: {line!r}")
+
+    async def _call(self, connection, *args: Any) -> Any:
+        reader, writer = connection
+        writer.write(self._encode(args))
+        await writer.drain()
+        return await self._read(reader)
+
+    async def _connect(self):
+        connection = await asyncio.open_connection(self.host, self.port)
+        if self.password:
+            await self._call(connection, "AUTH", self.password)
+        if self.db:
+            await self._call(connection, "SELECT", self.db)
+        return connection
+
+    async def execute(self, *args: Any) -> Any:
+        """コマンドを実行して応答を返却."""
+        async with self._semaphore:
+            connection = self._idle.pop() if self._idle else None
+            try:
+                async with asyncio.timeout(self.timeout):
+                    if connection is None:
+                        connection = await self._connect()
+                    result = await self._call(connection, *args)
+            except BaseException:
+                # 応答の途中で失敗した接続は再利用しない
+                if connection is not None:
+                    connection[1].close()
+                raise
+            self._idle.append(connection)
+            return result
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """キーに対応する値を返却(無い場合・期限切れの場合はNone)."""
+        return await self.execute("GET", key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        """キーに値を設定(ttlは有効期限の秒数)."""
+        await self.execute("SET", key, value, "PX", max(1, int(ttl * 1000)))
+
+    async def delete(self, key: str) -> None:
+        """キーに対応する値を削除."""
+        await self.execute("DEL", key)
+
+    async def exists(self, key: str) -> bool:
+        """有効期限内の値を保持しているかどうか."""
+        return await self.execute("EXISTS", key) == 1
+
+    async def close(self) -> None:
+        """保存先との接続を解放."""
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+
+
+def _dumps_json(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def _loads_json(data: bytes) -> Any:
+    return json.loads(data)
+
+
+_BACKEND_ERRORS = (OSError, EOFError, RedisError, asyncio.TimeoutError)
+"""バックエンドとの通信時の例外(キャッシュに無いものとして扱う)"""
+
+
+class CacheNamespace:
+    """名前空間ごとのキャッシュ.
+
+    値のシリアライズ(既定はJSON)、有効期限、利用状況の集計を行う。
+    バックエンドとの通信に失敗した場合はキャッシュに無いものとして扱う。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float,
+        maxsize: int,
+        dumps: Callable[[Any], Any] = lambda value: value,
+        loads: Callable[[Any], Any] = lambda value: value,
+    ):
+        """初期化.
+
+        引数:
+            name (str): 名前空間(キーの接頭辞・メトリクスの識別に使用)。
+            ttl (float): 有効期限(秒)。
+            maxsize (int): 保持する最大件数(memoryバックエンドの場合のみ)。
+            dumps (Callable): 値をJSONに変換できる形式に変換する関数。
+            loads (Callable): dumpsで変換した値を元に戻す関数。
+        """
+        self.name = name
+        self.ttl = ttl
+        self._dumps = dumps
+        self._loads = loads
+        self._backend = _create_backend(maxsize)
+        self.stats = CacheStats()
+        _namespaces[name] = self
+
+    def _key(self, key: Any) -> str:
+        return f"{cache_settings.CACHE_KEY_PREFIX}:{self.name}:{key}"
+
+    async def get(self, key: Any) -> Any:
+        """キーに対応する値を返却(無い場合・期限切れの場合はNone)."""
+        try:
+            data = await self._backend.get(self._key(key))
+        except _BACKEND_ERRORS as exc:
+            print(f"キャッシュの取得に失敗しました: {exc!r}")
+            self.stats.errors += 1
+            data = None
+        if data is None:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return self._loads(_loads_json(data))
+
+    async def set(
+        self, key: Any, value: Any, ttl: Optional[float] = None
+    ) -> None:
+        """キーに値を設定(ttlを省略した場合は名前空間の有効期限)."""
+        data = _dumps_json(self._dumps(value))
+        try:
+            await self._backend.set(self._key(key), data, ttl or self.ttl)
+        except _BACKEND_ERRORS as exc:
+            print(f"キャッシュの設定に失敗しました: {exc!r}")
+            self.stats.errors += 1
+
+    async def delete(self, key: Any) -> None:
+        """キーに対応する値を削除."""
+        try:
+            await self._backend.delete(self._key(key))
+        except _BACKEND_ERRORS as exc:
+            print(f"キャッシュの削除に失敗しました: {exc!r}")
+            self.stats.errors += 1
+
+    async def exists(self, key: Any) -> bool:
+        """有効期限内の値を保持しているかどうか(ヒット数・ミス数には含めない)."""
+        try:
+            return await self._backend.exists(self._key(key))
+        except _BACKEND_ERRORS as exc:
+            print(f"キャッシュの確認に失敗しました: {exc!r}")
+            self.stats.errors += 1
+            return False
+
+
+_namespaces: Dict[str, CacheNamespace] = {}
+
+_shared_backend: Optional[CacheBackend] = None
+"""ワーカー間で共有するバックエンド(redisの場合)"""
+
+
+def _create_backend(maxsize: int) -> CacheBackend:
+    global _shared_backend
+    if cache_settings.CACHE_BACKEND == "redis":
+        if _shared_backend is None:
+            _shared_backend = RedisBackend(
+                cache_settings.CACHE_REDIS_URL,
+                pool_size=cache_settings.CACHE_REDIS_POOL_SIZE,
+                timeout=cache_settings.CACHE_REDIS_TIMEOUT_SECONDS,
+            )
+        return _shared_backend
+    return MemoryBackend(maxsize)
+
+
+async def close_cache_backends() -> None:
+    """バックエンドとの接続を解放."""
+    if _shared_backend is not None:
+        await _shared_backend.close()
+
+
+def get_cache_stats() -> Dict[str, dict]:
+    """名前空間ごとの利用状況(メトリクス)を返却."""
+    return {
+        name: {**asdict(cache.stats), "hit_ratio": cache.stats.hit_ratio}
+        for name, cache in _namespaces.items()
+    }
@@ -0,0 +1,89 @@
+"""レスポンスの文字コード判定用のモジュール.
+
+Content-Typeヘッダーやmetaタグのcharset指定から文字コードを判定し、
+指定が無い場合のみ本文全体の統計的な判定(charset_normalizer)を行う。
+"""
+import codecs
+import re
+from typing import Optional
+
+import httpx
+from charset_normalizer import detect
+
+from config.environment import http_settings
+
+_META_CHARSET = re.compile(
+    rb"""<meta[^>]+charset\s*=\s*["']?([\w.:-]+)""", re.I
+)
+"""metaタグのcharset指定"""
+
+_META_SCAN_BYTES = 2048
+"""metaタグのcharset指定を探す範囲(先頭からのバイト数)"""
+
+
+def _normalize(charset: Optional[str]) -> Optional[str]:
+    """Pythonで扱える文字コード名であれば正規化して返却."""
+    if not charset:
+        return None
+    try:
+        return codecs.lookup(charset.strip().strip("\"'")).name
+    except LookupError:
+        return None
+
+
+def sniff_meta_charset(content: bytes) -> Optional[str]:
+    """HTML先頭のmetaタグから文字コードを取得."""
+    match = _META_CHARSET.search(content[:_META_SCAN_BYTES])
+    if match is None:
+        return None
+    return _normalize(match.group(1).decode("ascii", "ignore"))
+
+
+def detect_encoding(
+    content: bytes,
+    content_type: Optional[str] = None,
+    host: Optional[str] = None,
+) -> Optional[str]:
+    """レスポンス本文の文字コードを判定する関数.
+
+    判定は以下の順に行い、最初に決まったものを返す。
+    1. Content-Typeヘッダーのcharset指定
+    2. UTF-8であることが分かっているホスト(HTTP_UTF8_HOSTS)
+    3. metaタグのcharset指定
+    4. 本文全体の統計的な判定
+
+    Parameters:
+    - content (bytes): レスポンス本文。
+    - content_type (str): Content-Typeヘッダーの値。
+    - host (str): 接続先ホスト名。
+
+    Returns:
+    - str|None: 文字コード名。判定できなかった場合はNone。
+    """
+    if content_type:
+        for param in content_type.split(";")[1:]:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "charset":
+                charset = _normalize(value)
+                if charset is not None:
+                    return charset
+
+    if host in http_settings.HTTP_UTF8_HOSTS:
+        return "utf-8"
+
+    charset = sniff_meta_charset(content)
+    if charset is not None:
+        return charset
+
+    return detect(content)["encoding"]
+
+
+def apply_encoding(response: httpx.Response) -> None:
+    """レスポンスの文字コードを判定して設定."""
+    encoding = detect_encoding(
+        response.content,
+        response.headers.get("content-type"),
+        response.url.host,
+    )
+    if encoding is not None:
+        response.encoding = encoding
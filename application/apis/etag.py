@@ -0,0 +1,55 @@
+"""ETagによる条件付きレスポンス用のモジュール."""
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+CACHE_CONTROL = "private, no-cache"
+"""ユーザーごとの内容を含むため共有キャッシュには保存させず、利用時は必ず再検証させる"""
+
+
+def make_etag(body: bytes) -> str:
+    """レスポンス本文から強いETagを生成."""
+    return f'"{hashlib.sha256(body).hexdigest()}"'
+
+
+def is_not_modified(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-MatchヘッダーがETagと一致するかどうかを返却.
+
+    If-None-Matchの比較は弱い比較(W/の有無を無視)で行う。
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        tag.strip().removeprefix("W/") == etag
+        for tag in if_none_match.split(",")
+    )
+
+
+def etag_response(request: Request, model: BaseModel) -> Response:
+    """ETag付きのJSONレスポンスを返却.
+
+    クライアントが同じ内容を保持している(If-None-Matchが一致する)場合は、
+    本文を含まない304レスポンスを返す。
+
+    Parameters:
+    - request (Request): リクエスト。
+    - model (BaseModel): レスポンスの内容。
+
+    Returns:
+    - Response: 200(本文あり)または304(本文なし)のレスポンス。
+    """
+    response = JSONResponse(content=jsonable_encoder(model))
+    etag = make_etag(response.body)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if is_not_modified(request.headers.get("if-none-match"), etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers=headers
+        )
+    response.headers.update(headers)
+    return response
@@ -0,0 +1,136 @@
+"""条件付きGET(再検証)用のHTTPキャッシュのモジュール.
+
+ETag/Last-Modifiedを返したレスポンスの本文を保持し、
+再取得時にIf-None-Match/If-Modified-Sinceを付与する。
+304が返された場合は保持している本文を利用する。
+"""
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional
+
+import httpx
+
+from config.environment import http_settings
+
+_STORED_HEADERS = ("content-type", "etag", "last-modified")
+"""保持するレスポンスヘッダー"""
+
+
+@dataclass
+class CachedResponse:
+    """保持しているレスポンス."""
+
+    content: bytes
+    headers: Dict[str, str]
+
+    @property
+    def etag(self) -> Optional[str]:
+        """ETag."""
+        return self.headers.get("etag")
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        """Last-Modified."""
+        return self.headers.get("last-modified")
+
+
+@dataclass
+class HttpCacheStats:
+    """HTTPキャッシュの利用状況(メトリクス)."""
+
+    revalidations: int = 0
+    """条件付きGETを送信した回数"""
+    not_modified: int = 0
+    """304により保持している本文を利用した回数"""
+    stores: int = 0
+    """本文を保持(更新)した回数"""
+    evictions: int = 0
+    """容量超過で破棄した件数"""
+    bytes_saved: int = 0
+    """304により転送を省略できた本文のバイト数"""
+
+
+class HttpCache:
+    """URL単位でレスポンスを保持するキャッシュ(合計バイト数で上限を設けたLRU)."""
+
+    def __init__(self, max_bytes: int):
+        """初期化."""
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._size = 0
+        self.stats = HttpCacheStats()
+
+    def conditional_headers(self, key: str) -> Dict[str, str]:
+        """再検証用のリクエストヘッダーを返却(保持していない場合は空).
+
+        304が返されるまでに破棄されにくいよう、再検証するエントリは最近使用したものとする。
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return {}
+        self._entries.move_to_end(key)
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        if headers:
+            self.stats.revalidations += 1
+        return headers
+
+    def not_modified(
+        self, key: str, response: httpx.Response
+    ) -> Optional[httpx.Response]:
+        """304レスポンスを保持している本文から組み立てたレスポンスに置き換える."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        # 304で新しい検証子が返された場合は更新する
+        for name in ("etag", "last-modified"):
+            if name in response.headers:
+                entry.headers[name] = response.headers[name]
+        self.stats.not_modified += 1
+        self.stats.bytes_saved += len(entry.content)
+        return httpx.Response(
+            status_code=httpx.codes.OK,
+            headers=entry.headers,
+            content=entry.content,
+            request=response.request,
+        )
+
+    def store(self, key: str, response: httpx.Response) -> None:
+        """検証子を持つレスポンスを保持."""
+        headers = {
+            name: response.headers[name]
+            for name in _STORED_HEADERS
+            if name in response.headers
+        }
+        if "etag" not in headers and "last-modified" not in headers:
+            return
+        content = response.content
+        if len(content) > self.max_bytes:
+            return
+
+        self._discard(key)
+        self._entries[key] = CachedResponse(content=content, headers=headers)
+        self._size += len(content)
+        self.stats.stores += 1
+        while self._size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._discard(oldest)
+            self.stats.evictions += 1
+
+    def _discard(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry.content)
+
+
+http_cache = HttpCache(http_settings.HTTP_CACHE_MAX_BYTES)
+"""外部通信用のHTTPキャッシュ"""
+
+
+def get_http_cache_stats() -> dict:
+    """HTTPキャッシュの利用状況(メトリクス)を返却."""
+    return asdict(http_cache.stats)
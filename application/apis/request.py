@@ -1,14 +1,113 @@
 """共通処理(fetch)."""
-import requests
+import asyncio
+from typing import Optional
 
+import httpx
+from fastapi import status
 
-def request_get(
+from apis.encoding import apply_encoding
+from apis.exception import ErrorHttpException
+from apis.http_cache import http_cache
+from apis.resilience import (
+    RETRYABLE_STATUS_CODES,
+    backoff_delay,
+    get_circuit_breaker,
+)
+from apis.throttle import get_throttle
+from config.environment import http_settings
+
+
+class HttpClientFactory:
+    """非同期HTTPクライアント生成用のファクトリ.
+
+    Keep-Aliveのコネクションプールを共有するため、
+    アプリケーション全体で1つのクライアントを使い回す。
+    """
+
+    _client: Optional[httpx.AsyncClient] = None
+
+    @classmethod
+    def create(cls) -> httpx.AsyncClient:
+        """クライアントを生成(生成済みの場合はそのまま返却)."""
+        if cls._client is None:
+            cls._client = httpx.AsyncClient(
+                timeout=http_settings.HTTP_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=http_settings.HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=(
+                        http_settings.HTTP_MAX_KEEPALIVE_CONNECTIONS
+                    ),
+                    keepalive_expiry=http_settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+                ),
+                follow_redirects=True,
+            )
+        return cls._client
+
+    @classmethod
+    async def close(cls) -> None:
+        """クライアントを破棄し、コネクションプールを解放."""
+        if cls._client is not None:
+            client, cls._client = cls._client, None
+            await client.aclose()
+
+
+async def _get_with_retry(url, headers, payload) -> Optional[httpx.Response]:
+    """リトライとサーキットブレーカーを適用してGET通信する.
+
+    通信エラーやリトライ対象のステータスコードの場合は、待機時間を空けて再送する。
+    接続先ホストが遮断中の場合は通信せずに503エラーとする。
+    """
+    breaker = get_circuit_breaker(url)
+    throttle = get_throttle(url)
+    max_attempts = http_settings.HTTP_RETRY_MAX_ATTEMPTS
+    for attempt in range(max_attempts):
+        if not breaker.allow():
+            raise ErrorHttpException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                error="service_unavailable",
+                error_description="小説家になろうに接続できません。時間をおいて再度お試しください。",
+            )
+
+        retry_after = None
+        try:
+            async with throttle.slot():
+                response = await HttpClientFactory.create().get(
+                    url, params=payload, headers=headers
+                )
+        except httpx.TransportError as err:
+            print(err)
+        except BaseException:
+            # リダイレクトの上限超過やキャンセル等で抜けた場合も、
+            # 試行中(half-open)のまま遮断が解除されなくならないようにする
+            breaker.release()
+            raise
+        else:
+            if response.status_code not in RETRYABLE_STATUS_CODES:
+                breaker.record_success()
+                return response
+            print(f"{response.status_code} {response.url}")
+            retry_after = response.headers.get("retry-after")
+
+        breaker.record_failure()
+        if attempt + 1 < max_attempts:
+            await asyncio.sleep(backoff_delay(attempt, retry_after))
+    return None
+
+
+async def request_get(
     url,
     headers=None,
     payload=None,
 ):
     """Get通信した結果のレスポンスを返す.
 
+    接続先ホストごとの流量制御(レート制限・同時接続数の上限)を経由して通信する。
+    通信エラー時は指数バックオフでリトライし、
+    接続先ホストが遮断中(サーキットブレーカーが作動中)の場合は503エラーとする。
+    以前に検証子(ETag/Last-Modified)付きで取得したURLは条件付きGETで再検証し、
+    304の場合は保持している本文をレスポンスとして返す
+    (304の受信までに本文が破棄された場合は条件なしで取得し直す)。
+
     Parameters
     ----------
     url : str
@@ -16,16 +115,34 @@ def request_get(
 
     Returns:
     -------
-    requests.Response
+    httpx.Response
         取得したレスポンス情報を返す
     None
         正常通信できなかった場合
     """
+    cache_key = str(httpx.URL(url, params=payload))
+    conditional_headers = http_cache.conditional_headers(cache_key)
     try:
-        response = requests.get(url=url, params=payload, headers=headers)
-        response.raise_for_status()
-        response.encoding = response.apparent_encoding
+        response = await _get_with_retry(
+            url, {**(headers or {}), **conditional_headers}, payload
+        )
+        if response is None:
+            return None
+        cached_response = None
+        if response.status_code == httpx.codes.NOT_MODIFIED:
+            cached_response = http_cache.not_modified(cache_key, response)
+            if cached_response is None and conditional_headers:
+                # 304の受信までに保持していた本文が破棄された場合は、条件なしで取得し直す
+                response = await _get_with_retry(url, headers, payload)
+                if response is None:
+                    return None
+        if cached_response is not None:
+            response = cached_response
+        else:
+            response.raise_for_status()
+            http_cache.store(cache_key, response)
+        apply_encoding(response)
         return response
-    except requests.exceptions.RequestException as err:
+    except httpx.HTTPError as err:
         print(err)
         return None
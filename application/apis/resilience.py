@@ -0,0 +1,99 @@
+"""外部通信の障害対策(リトライ・サーキットブレーカー)用のモジュール."""
+import random
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from config.environment import http_settings
+
+RETRYABLE_STATUS_CODES = frozenset(
+    {
+        httpx.codes.TOO_MANY_REQUESTS,
+        httpx.codes.INTERNAL_SERVER_ERROR,
+        httpx.codes.BAD_GATEWAY,
+        httpx.codes.SERVICE_UNAVAILABLE,
+        httpx.codes.GATEWAY_TIMEOUT,
+    }
+)
+"""リトライ対象(接続先の障害とみなす)のステータスコード"""
+
+
+def backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """リトライまでの待機時間(秒)を返却.
+
+    指数バックオフの上限内でランダムに待機時間を決める(full jitter)。
+    Retry-Afterヘッダー(秒数)が指定されている場合は上限の範囲内でそれに従う。
+    """
+    cap = http_settings.HTTP_RETRY_BACKOFF_MAX_SECONDS
+    if retry_after is not None and retry_after.isdigit():
+        return min(cap, float(retry_after))
+    base = http_settings.HTTP_RETRY_BACKOFF_BASE_SECONDS
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+class CircuitBreaker:
+    """接続先ホストの障害時に通信を遮断するサーキットブレーカー.
+
+    連続して`failure_threshold`回失敗すると遮断(open)し、
+    `reset_seconds`秒経過後に1件だけ試行(half-open)を許可する。
+    試行が成功すれば遮断を解除し、失敗すれば再び遮断する。
+    試行が成否を記録せずに終わった場合は`release`で試行枠を戻す。
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        """初期化."""
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+
+    @property
+    def is_open(self) -> bool:
+        """遮断中かどうか."""
+        return self._opened_at is not None
+
+    def allow(self) -> bool:
+        """通信してよいかどうかを返却."""
+        if self._opened_at is None:
+            return True
+        elapsed = time.monotonic() - self._opened_at
+        if elapsed >= self.reset_seconds and not self._trial:
+            self._trial = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        """通信の成功を記録."""
+        self._failures = 0
+        self._opened_at = None
+        self._trial = False
+
+    def release(self) -> None:
+        """成否を記録せずに終わった試行の枠を戻す."""
+        self._trial = False
+
+    def record_failure(self) -> None:
+        """通信の失敗を記録."""
+        self._failures += 1
+        self._trial = False
+        if self._failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(url: str) -> CircuitBreaker:
+    """URLの接続先ホストに対応するサーキットブレーカーを返却."""
+    host = urlsplit(url).hostname or ""
+    breaker = _breakers.get(host)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            failure_threshold=http_settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+            reset_seconds=http_settings.CIRCUIT_BREAKER_RESET_SECONDS,
+        )
+        _breakers[host] = breaker
+    return breaker
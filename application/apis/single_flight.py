@@ -0,0 +1,41 @@
+"""同一リクエストの重複実行を抑止するためのモジュール.
+
+同じキーの処理が実行中の場合、後続の呼び出しは新たに実行せず、
+実行中の処理の結果を待ち受けて共有する。
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+def make_key(url: str, payload: Optional[dict] = None) -> tuple:
+    """URLとクエリパラメータから重複判定用のキーを生成."""
+    params = tuple(sorted((payload or {}).items()))
+    return (url, params)
+
+
+class SingleFlight:
+    """キー単位で実行中の処理を1つにまとめるクラス."""
+
+    def __init__(self):
+        """初期化."""
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]):
+        """キーに対応する処理を実行し、その結果を返却.
+
+        同じキーの処理が実行中であれば、その完了を待って同じ結果(例外)を返す。
+        呼び出し元がキャンセルされても、待ち受けている他の呼び出し元のため処理は継続する。
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # 待ち受けが全てキャンセルされた場合に未取得の例外として警告されないようにする
+        if not task.cancelled():
+            task.exception()
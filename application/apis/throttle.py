@@ -0,0 +1,133 @@
+"""外部通信の流量制御用のモジュール.
+
+接続先ホストごとにトークンバケットによるレート制限と、
+同時接続数(in-flight)の上限を設ける。
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from typing import Dict
+from urllib.parse import urlsplit
+
+from config.environment import http_settings
+
+
+@dataclass
+class ThrottleStats:
+    """流量制御の待機状況(メトリクス)."""
+
+    requests: int = 0
+    """流量制御を通過したリクエスト数"""
+    waited: int = 0
+    """待機が発生したリクエスト数"""
+    total_wait_seconds: float = 0.0
+    """待機時間の合計(秒)"""
+    max_wait_seconds: float = 0.0
+    """待機時間の最大値(秒)"""
+    queued: int = 0
+    """現在待機中のリクエスト数"""
+    in_flight: int = 0
+    """現在通信中のリクエスト数"""
+
+
+class TokenBucket:
+    """トークンバケットによるレート制限.
+
+    1秒あたり`rate`個のトークンを補充し、最大`capacity`個まで貯める。
+    トークンが無い場合は補充されるまで待機する。
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        """初期化."""
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated_at
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        """トークンを1つ消費する(無い場合は待機)."""
+        # ロックを保持したまま待機することで、到着順にトークンを払い出す
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+class HostThrottle:
+    """ホスト単位の流量制御(レート制限+同時接続数の上限)."""
+
+    def __init__(self, rate: float, burst: int, max_in_flight: int):
+        """初期化."""
+        self._bucket = TokenBucket(rate, burst)
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self.stats = ThrottleStats()
+
+    @asynccontextmanager
+    async def slot(self):
+        """通信枠を確保するコンテキストマネージャ."""
+        stats = self.stats
+        stats.queued += 1
+        start = time.monotonic()
+        try:
+            await self._semaphore.acquire()
+            try:
+                await self._bucket.acquire()
+            except BaseException:
+                self._semaphore.release()
+                raise
+        finally:
+            stats.queued -= 1
+
+        wait = time.monotonic() - start
+        stats.requests += 1
+        stats.total_wait_seconds += wait
+        stats.max_wait_seconds = max(stats.max_wait_seconds, wait)
+        if wait > 0.001:
+            stats.waited += 1
+
+        stats.in_flight += 1
+        try:
+            yield
+        finally:
+            stats.in_flight -= 1
+            self._semaphore.release()
+
+
+_throttles: Dict[str, HostThrottle] = {}
+
+
+def get_throttle(url: str) -> HostThrottle:
+    """URLの接続先ホストに対応する流量制御を返却."""
+    host = urlsplit(url).hostname or ""
+    throttle = _throttles.get(host)
+    if throttle is None:
+        limit = http_settings.UPSTREAM_HOST_LIMITS.get(host)
+        if limit is None:
+            throttle = HostThrottle(
+                rate=http_settings.UPSTREAM_RATE_PER_SECOND,
+                burst=http_settings.UPSTREAM_BURST,
+                max_in_flight=http_settings.UPSTREAM_MAX_IN_FLIGHT,
+            )
+        else:
+            throttle = HostThrottle(
+                rate=limit.rate_per_second,
+                burst=limit.burst,
+                max_in_flight=limit.max_in_flight,
+            )
+        _throttles[host] = throttle
+    return throttle
+
+
+def get_throttle_stats() -> Dict[str, dict]:
+    """ホストごとの待機状況(メトリクス)を返却."""
+    return {host: asdict(t.stats) for host, t in _throttles.items()}
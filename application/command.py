@@ -7,6 +7,11 @@
 
 利用可能なコマンド:
     load_json: JSONファイルを読み込み、指定された処理を実行します。
+    create_signature: APIの署名を生成して表示します。
+    record_pages: ベンチマーク用に小説家になろうのページを記録します。
+    benchmark_decode: 文字コード判定の処理時間を比較します。
+    warm_cache: お気に入り登録数の多い小説のキャッシュをウォームアップします。
+    benchmark_parser: HTMLパーサーごとの解析結果と処理時間を比較します。
 
 注意:
     コマンドライン引数が適切でない場合、エラーメッセージを表示します。
@@ -14,7 +19,14 @@
 import asyncio
 import sys
 
-from command import create_signature, load_json
+from command import (
+    benchmark_decode,
+    benchmark_parser,
+    create_signature,
+    load_json,
+    record_pages,
+    warm_cache,
+)
 
 if __name__ == "__main__":
     args = sys.argv
@@ -24,5 +36,13 @@ if __name__ == "__main__":
         asyncio.run(load_json.run(args))
     elif args[1] == "create_signature":
         create_signature.run()
+    elif args[1] == "record_pages":
+        asyncio.run(record_pages.run(args))
+    elif args[1] == "benchmark_decode":
+        benchmark_decode.run(args)
+    elif args[1] == "benchmark_parser":
+        benchmark_parser.run(args)
+    elif args[1] == "warm_cache":
+        asyncio.run(warm_cache.run(args))
     else:
         print(f"不明なコマンド: {args[1]}", file=sys.stderr)
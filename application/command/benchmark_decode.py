@@ -0,0 +1,64 @@
+"""文字コード判定の処理時間を比較するベンチマークコマンド.
+
+record_pagesコマンドで記録したページを対象に、
+従来の判定(本文全体の統計的な判定)とヘッダー/metaタグ/既知ホストによる判定で
+デコードにかかる時間を比較します。
+
+使い方:
+    python command.py benchmark_decode [ファイル名...]
+"""
+import sys
+import timeit
+
+from charset_normalizer import detect
+
+from apis.encoding import detect_encoding
+from command.record_pages import load_pages
+
+REPEAT = 5
+"""計測の繰り返し回数(最小値を採用)"""
+
+
+def _decode_old(content):
+    return content.decode(detect(content)["encoding"], "replace")
+
+
+def _decode_meta(content):
+    return content.decode(detect_encoding(content), "replace")
+
+
+def _decode_known_host(content):
+    return content.decode(
+        detect_encoding(content, host="ncode.syosetu.com"), "replace"
+    )
+
+
+def _measure(func, content):
+    return min(timeit.repeat(lambda: func(content), number=1, repeat=REPEAT))
+
+
+def run(args):
+    """スクリプトのメイン実行関数.
+
+    引数:
+        args (list): コマンドライン引数のリスト。
+    """
+    paths = load_pages(args[2:])
+    if not paths:
+        print("record_pagesコマンドでページを記録してください", file=sys.stderr)
+        return
+
+    print("ファイル名, サイズ(bytes), 従来(ms), metaタグ(ms), 既知ホスト(ms)")
+    for path in paths:
+        content = path.read_bytes()
+        expected = _decode_old(content)
+        results = []
+        for func in (_decode_old, _decode_meta, _decode_known_host):
+            if func(content) != expected:
+                print(f"{path.name}: {func.__name__}のデコード結果が一致しません")
+            results.append(_measure(func, content) * 1000)
+        old, meta, known_host = results
+        print(
+            f"{path.name}, {len(content)}, {old:.3f}, {meta:.3f}, "
+            f"{known_host:.3f} (x{old / known_host:.1f})"
+        )
@@ -0,0 +1,66 @@
+"""HTMLパーサーごとの解析結果と処理時間を比較するベンチマークコマンド.
+
+record_pagesコマンドで記録したページを対象に、
+各パーサー(html.parser/lxml)の解析結果がhtml.parserと一致するかを確認し、
+解析にかかる時間を比較します。
+
+使い方:
+    python command.py benchmark_parser [ファイル名...]
+"""
+import sys
+import timeit
+
+from apis.encoding import detect_encoding
+from command.record_pages import load_pages
+from domain.narou.parser import LXML_AVAILABLE, PARSERS, SoupParser
+
+REPEAT = 5
+"""計測の繰り返し回数(最小値を採用)"""
+
+
+def _parse_func(parser, path):
+    """ファイル名から目次ページか本文ページかを判定し、解析関数を返します."""
+    if "_toc_" in path.name:
+        return parser.parse_toc
+    return parser.parse_episode
+
+
+def _measure(func, html):
+    return min(timeit.repeat(lambda: func(html), number=1, repeat=REPEAT))
+
+
+def run(args):
+    """スクリプトのメイン実行関数.
+
+    引数:
+        args (list): コマンドライン引数のリスト。
+    """
+    paths = load_pages(args[2:])
+    if not paths:
+        print("record_pagesコマンドでページを記録してください", file=sys.stderr)
+        return
+
+    parsers = [parser() for parser in PARSERS.values()]
+    if not LXML_AVAILABLE:
+        print("lxmlがインストールされていないため比較できません", file=sys.stderr)
+        parsers = [SoupParser()]
+
+    names = ", ".join(f"{parser.name}(ms)" for parser in parsers)
+    print(f"ファイル名, サイズ(bytes), {names}")
+    for path in paths:
+        content = path.read_bytes()
+        html = content.decode(
+            detect_encoding(content, host="ncode.syosetu.com"), "replace"
+        )
+        expected = _parse_func(SoupParser(), path)(html)
+        results = []
+        for parser in parsers:
+            func = _parse_func(parser, path)
+            if func(html) != expected:
+                print(f"{path.name}: {parser.name}の解析結果が一致しません")
+            results.append(_measure(func, html) * 1000)
+        times = ", ".join(f"{result:.3f}" for result in results)
+        print(
+            f"{path.name}, {len(content)}, {times} "
+            f"(x{results[0] / min(results):.1f})"
+        )
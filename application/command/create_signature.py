@@ -12,11 +12,14 @@ def run():
     api_tuple = (
         ("GET", "http://localhost:8000/api/novelinfo"),
         ("GET", "http://localhost:8000/api/maintext"),
+        ("GET", "http://localhost:8000/api/maintext/stream"),
         ("GET", "http://localhost:8000/api/follow"),
+        ("GET", "http://localhost:8000/api/follow/new_episodes"),
         ("POST", "http://localhost:8000/api/follow"),
         ("DELETE", "http://localhost:8000/api/follow"),
         ("POST", "http://localhost:8000/api/token"),
         ("POST", "http://localhost:8000/api/user"),
+        ("GET", "http://localhost:8000/api/metrics"),
     )
     for method, url in api_tuple:
         print(method, url, create_signature(method, url))
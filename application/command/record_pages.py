@@ -0,0 +1,84 @@
+"""ベンチマーク用に小説家になろうのページを記録するコマンド.
+
+目次ページ(1ページ目)と指定した話の本文ページを取得し、
+fixtures/pagesディレクトリにHTMLファイルとして保存します。
+
+使い方:
+    python command.py record_pages [ncode] [話数...]
+"""
+import sys
+from pathlib import Path
+
+from apis.exception import ErrorHttpException
+from apis.request import HttpClientFactory, request_get
+from apis.urls import Url
+from apis.user_agent import UserAgentManager
+
+PAGES_DIR = Path("fixtures") / "pages"
+"""記録したページの保存先"""
+
+
+def load_pages(names):
+    """記録したページのファイルパスを返します.
+
+    引数:
+        names (list): ファイル名のリスト。空の場合は記録済みの全ページを対象とします。
+
+    戻り値:
+        list: 存在するファイルのPathオブジェクトのリスト。
+    """
+    if not names:
+        return sorted(PAGES_DIR.glob("*.html"))
+    paths = []
+    for name in names:
+        path = PAGES_DIR / name
+        if not path.exists():
+            print(f"{path}が存在していないです", file=sys.stderr)
+            continue
+        paths.append(path)
+    return paths
+
+
+async def run(args):
+    """スクリプトのメイン実行関数.
+
+    引数:
+        args (list): コマンドライン引数のリスト。
+    """
+    if len(args) < 3:
+        print("記録する小説のNコードを指定してください", file=sys.stderr)
+        return
+    ncode, episodes = args[2], args[3:]
+
+    targets = [
+        (
+            f"{ncode}_toc_1.html",
+            Url.NOVEL_URL.value,
+            {"ncode": ncode, "p": 1},
+        )
+    ]
+    for episode in episodes:
+        targets.append(
+            (
+                f"{ncode}_{episode}.html",
+                Url.NOVEL_URL.join(ncode, episode),
+                None,
+            )
+        )
+
+    PAGES_DIR.mkdir(parents=True, exist_ok=True)
+    headers = UserAgentManager().get_random_user_headers()
+    try:
+        for file_name, url, payload in targets:
+            try:
+                response = await request_get(url, headers, payload)
+            except ErrorHttpException as exc:
+                print(exc.detail, file=sys.stderr)
+                return
+            if response is None:
+                print(f"{url}の取得に失敗しました", file=sys.stderr)
+                continue
+            (PAGES_DIR / file_name).write_bytes(response.content)
+            print(f"{PAGES_DIR / file_name}を保存しました")
+    finally:
+        await HttpClientFactory.close()
@@ -0,0 +1,124 @@
+"""お気に入り登録数の多い小説のキャッシュをウォームアップするコマンド.
+
+お気に入り登録数の多い順に、小説情報・目次・最新話の本文を並行して取得し、
+キャッシュ(およびDB)に格納します。
+外部に送るリクエスト数は1件ごとに数え、WARM_CACHE_MAX_REQUESTSに達した時点で
+取得途中の小説も含めて打ち切ります。
+
+使い方:
+    python command.py warm_cache [小説数]
+"""
+import asyncio
+import sys
+
+from apis.cache import close_cache_backends, get_cache_stats
+from apis.exception import ErrorHttpException
+from apis.request import HttpClientFactory
+from config.config import SessionFactory
+from config.environment import cache_settings
+from crud import get_most_followed_books
+from domain.narou.main_text import load_episode
+from domain.narou.metadata import get_novel_data
+from domain.narou.narou_data import get_narou_api_stats
+from domain.narou.novel_info import load_chapters
+
+
+class RequestBudgetExceeded(Exception):
+    """外部に送るリクエスト数が上限に達したことを表す例外."""
+
+
+class RequestBudget:
+    """外部に送るリクエスト数の上限.
+
+    HTTPクライアントのリクエストのイベントフックとして、送信(リトライ・リダイレクトを含む)の
+    直前に1件ずつ消費し、上限に達した後のリクエストはRequestBudgetExceededで中断します。
+    """
+
+    def __init__(self, limit):
+        """初期化."""
+        self.limit = limit
+        self.used = 0
+
+    @property
+    def exhausted(self):
+        """上限に達したかどうか."""
+        return self.used >= self.limit
+
+    async def consume(self, request):
+        """リクエストを1件消費します(上限に達している場合は送信せずに中断)."""
+        if self.exhausted:
+            raise RequestBudgetExceeded(str(request.url))
+        self.used += 1
+
+
+async def warm_book(book_id, ncode, latest_episodes):
+    """1作品分の小説情報・目次・最新話の本文を取得してキャッシュに格納します.
+
+    引数:
+        book_id (str): 小説のID。
+        ncode (str): 小説のNコード。
+        latest_episodes (int): 取得する最新話の数。
+    """
+    novel_data = await get_novel_data(ncode)
+    if novel_data is None:
+        print(f"{ncode}: Nコードが存在しません", file=sys.stderr)
+        return
+    async with SessionFactory.create()() as db:
+        await load_chapters(db, book_id, ncode, novel_data)
+        last = novel_data.general_all_no
+        for episode in range(max(1, last - latest_episodes + 1), last + 1):
+            await load_episode(db, book_id, ncode, episode)
+    print(f"{ncode}: {novel_data.title}")
+
+
+async def run(args):
+    """スクリプトのメイン実行関数.
+
+    引数:
+        args (list): コマンドライン引数のリスト。
+    """
+    limit = (
+        int(args[2]) if len(args) > 2 else cache_settings.WARM_CACHE_BOOK_LIMIT
+    )
+    if cache_settings.CACHE_BACKEND == "memory":
+        print(
+            "CACHE_BACKENDがmemoryのため、DBへの保存のみがウォームアップされます",
+            file=sys.stderr,
+        )
+
+    async with SessionFactory.create()() as db:
+        books = await get_most_followed_books(db, limit)
+
+    budget = RequestBudget(cache_settings.WARM_CACHE_MAX_REQUESTS)
+    HttpClientFactory.create().event_hooks["request"].append(budget.consume)
+    semaphore = asyncio.Semaphore(cache_settings.WARM_CACHE_CONCURRENCY)
+    skipped = 0
+
+    async def worker(book_id, ncode):
+        nonlocal skipped
+        async with semaphore:
+            if budget.exhausted:
+                skipped += 1
+                return
+            try:
+                await warm_book(
+                    book_id, ncode, cache_settings.WARM_CACHE_LATEST_EPISODES
+                )
+            except RequestBudgetExceeded:
+                print(f"{ncode}: リクエスト数の上限により中断", file=sys.stderr)
+                skipped += 1
+            except ErrorHttpException as exc:
+                print(f"{ncode}: {exc.detail}", file=sys.stderr)
+
+    try:
+        await asyncio.gather(*(worker(*book) for book in books))
+    finally:
+        await HttpClientFactory.close()
+        await close_cache_backends()
+
+    print(
+        f"対象: {len(books)}件, 打ち切り: {skipped}件, "
+        f"リクエスト数: {budget.used}/{budget.limit}件"
+    )
+    print(get_cache_stats())
+    print(get_narou_api_stats())
@@ -1,7 +1,8 @@
 """環境変数の読み込み."""
 
-from typing import List
+from typing import Dict, List, Literal
 
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings
 
 
@@ -36,6 +37,129 @@ class PostgresSettings(BaseSettings):
     """PostgreSQLのポート番号"""
 
 
+class HostLimit(BaseModel):
+    """接続先ホストごとの流量制御の設定."""
+
+    rate_per_second: float
+    """1秒あたりに送信できるリクエスト数"""
+    burst: int
+    """瞬間的に送信できるリクエスト数"""
+    max_in_flight: int
+    """同時に通信できるリクエスト数"""
+
+
+class HttpSettings(BaseSettings):
+    """外部通信(小説家になろう)関連の設定クラス."""
+
+    HTTP_TIMEOUT_SECONDS: float = 10.0
+    """外部通信のタイムアウト(秒)"""
+    HTTP_MAX_CONNECTIONS: int = 20
+    """コネクションプールの最大接続数"""
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    """コネクションプールで保持するKeep-Alive接続数"""
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    """Keep-Alive接続を保持する時間(秒)"""
+    HTTP_UTF8_HOSTS: List[str] = ["ncode.syosetu.com", "api.syosetu.com"]
+    """文字コードがUTF-8であることが分かっているホスト(文字コードの判定を省略)"""
+    HTTP_RETRY_MAX_ATTEMPTS: int = 3
+    """通信エラー時の最大試行回数(初回を含む)"""
+    HTTP_RETRY_BACKOFF_BASE_SECONDS: float = 0.5
+    """リトライ時の待機時間の基準値(秒)"""
+    HTTP_RETRY_BACKOFF_MAX_SECONDS: float = 5.0
+    """リトライ時の待機時間の上限(秒)"""
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 5
+    """接続先ホストへの通信を遮断するまでの連続失敗回数"""
+    CIRCUIT_BREAKER_RESET_SECONDS: float = 30.0
+    """通信を遮断してから再試行を許可するまでの時間(秒)"""
+    HTTP_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    """条件付きGET用に保持するレスポンス本文の合計バイト数の上限"""
+    UPSTREAM_RATE_PER_SECOND: float = 5.0
+    """接続先ホストごとの1秒あたりのリクエスト数の上限"""
+    UPSTREAM_BURST: int = 10
+    """接続先ホストごとの瞬間的なリクエスト数の上限"""
+    UPSTREAM_MAX_IN_FLIGHT: int = 4
+    """接続先ホストごとの同時接続数の上限"""
+    NAROU_API_GZIP_LEVEL: int = 5
+    """なろうAPIのレスポンスの圧縮レベル(1〜5、0の場合は圧縮しない)"""
+    NAROU_API_BATCH_SIZE: int = 100
+    """なろうAPIの1リクエストでまとめて取得するNコードの数"""
+    TOC_FETCH_CONCURRENCY: int = 4
+    """目次ページを並行して取得する数(1作品あたり)"""
+    UPSTREAM_HOST_LIMITS: Dict[str, HostLimit] = {}
+    """ホスト名ごとに個別指定する流量制御の設定(JSON形式)
+
+    例: {"ncode.syosetu.com": {"rate_per_second": 2, "burst": 4, "max_in_flight": 2}}
+    """
+
+
+class CacheSettings(BaseSettings):
+    """キャッシュ関連の設定クラス."""
+
+    CACHE_BACKEND: Literal["memory", "redis"] = "memory"
+    """キャッシュの保存先(memory: ワーカーごとのプロセス内、redis: Redis互換サーバー)"""
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    """Redis互換サーバーの接続先"""
+    CACHE_REDIS_POOL_SIZE: int = 10
+    """Redis互換サーバーへの同時接続数の上限"""
+    CACHE_REDIS_TIMEOUT_SECONDS: float = 1.0
+    """Redis互換サーバーとの通信のタイムアウト(秒)"""
+    CACHE_KEY_PREFIX: str = "narou"
+    """キャッシュのキーの接頭辞"""
+    EPISODE_CACHE_MAX_ENTRIES: int = 1000
+    """本文キャッシュの最大件数"""
+    EPISODE_CACHE_TTL_SECONDS: int = 24 * 60 * 60
+    """本文キャッシュの有効期限(秒)"""
+    EPISODE_STORE_TTL_DAYS: int = 30
+    """DBに保存した本文を再取得するまでの日数"""
+    METADATA_CACHE_MAX_ENTRIES: int = 5000
+    """小説情報キャッシュの最大件数"""
+    METADATA_CACHE_TTL_SECONDS: int = 120
+    """小説情報キャッシュの有効期限(秒)"""
+    NEGATIVE_CACHE_MAX_ENTRIES: int = 10000
+    """存在しないNコード・話数のキャッシュの最大件数"""
+    NEGATIVE_CACHE_TTL_SECONDS: int = 60
+    """存在しないNコード・話数のキャッシュの有効期限(秒)"""
+    TOC_CACHE_MAX_ENTRIES: int = 500
+    """目次キャッシュの最大件数"""
+    TOC_CACHE_TTL_SECONDS: int = 10 * 60
+    """目次キャッシュの有効期限(秒)"""
+    PREFETCH_ENABLED: bool = False
+    """本文取得時に次話を先読みしてキャッシュに格納する（True）"""
+    PREFETCH_DEPTH: int = 1
+    """先読みする話数(1の場合は次話のみ、2の場合は次々話まで)"""
+    PREFETCH_MAX_QUEUE: int = 100
+    """先読み待ちの最大件数(超過した分は先読みしない)"""
+    PREFETCH_WORKERS: int = 2
+    """先読みを並行して行う数"""
+    BOOK_METADATA_TTL_SECONDS: int = 60 * 60
+    """DBに保存した小説情報の有効期限(秒、期限切れの場合は利用時になろうAPIから取得し直す)"""
+    BOOK_REFRESH_ENABLED: bool = True
+    """お気に入り済みの小説情報を定期的に更新するかどうか"""
+    BOOK_REFRESH_INTERVAL_SECONDS: int = 10 * 60
+    """小説情報の定期更新の間隔(秒、この時間より前に更新した小説が対象)"""
+    BOOK_REFRESH_BATCH_LIMIT: int = 500
+    """小説情報の定期更新で1回に更新する最大件数"""
+    WARM_CACHE_BOOK_LIMIT: int = 100
+    """キャッシュのウォームアップ対象とする小説数(お気に入り登録数の多い順)"""
+    WARM_CACHE_LATEST_EPISODES: int = 3
+    """キャッシュのウォームアップで取得する最新話の数"""
+    WARM_CACHE_CONCURRENCY: int = 4
+    """キャッシュのウォームアップを並行して行う小説数"""
+    WARM_CACHE_MAX_REQUESTS: int = 500
+    """キャッシュのウォームアップで外部に送るリクエスト数の上限"""
+
+
+class ParserSettings(BaseSettings):
+    """HTML解析関連の設定クラス."""
+
+    HTML_PARSER_BACKEND: Literal["html.parser", "lxml"] = "lxml"
+    """HTML解析に使用するパーサー(lxmlが利用できない場合はhtml.parser)"""
+    PARSE_PROCESS_WORKERS: int = 2
+    """HTML解析を行うプロセス数(0の場合はイベントループのスレッドで解析)"""
+    PARSE_MAX_PENDING: int = 32
+    """プロセスに依頼中(実行中・待機中)の解析の上限(超えた場合は空くまで待機)"""
+
+
 class JWTSettings(BaseSettings):
     """JWT関連の設定クラス."""
 
@@ -69,5 +193,14 @@ settings = VariableSettings()
 postgres_settings = PostgresSettings()
 """postgres関連の環境変数"""
 
+http_settings = HttpSettings()
+"""外部通信関連の環境変数"""
+
+cache_settings = CacheSettings()
+"""キャッシュ関連の環境変数"""
+
+parser_settings = ParserSettings()
+"""HTML解析関連の環境変数"""
+
 jwt_settings = JWTSettings()
 """JWT関連の環境変数"""
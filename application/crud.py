@@ -1,13 +1,17 @@
 """このスクリプトは、データベース操作に関連する複数の非同期関数を含んでいます."""
 
-from sqlalchemy import delete
+from datetime import datetime
+
+from sqlalchemy import and_, delete, func, update
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from models.book import Book
+from models.episode import Episode
 from models.follow import Follow
 from models.read_history import ReadHistory
+from models.toc import Toc
 from models.user import User
 
 
@@ -109,6 +113,185 @@ async def check_follow_exists_by_book_id(
     return True
 
 
+async def get_episode(db: AsyncSession, book_id: str, episode: int) -> Episode:
+    """指定されたbook_idと話数に対応する保存済みの本文を返す関数."""
+    result = await db.execute(
+        select(Episode).where(
+            Episode.book_id == book_id, Episode.episode == episode
+        )
+    )
+
+    return result.scalar_one_or_none()
+
+
+async def save_episode(
+    db: AsyncSession,
+    book_id: str,
+    episode: int,
+    sub_title: str,
+    body: bytes,
+    content_hash: str,
+):
+    """指定されたbook_idと話数に対応する本文を保存する。保存済みの場合は内容と取得日時を更新する."""
+    stmt = insert(Episode).values(
+        book_id=book_id,
+        episode=episode,
+        sub_title=sub_title,
+        body=body,
+        content_hash=content_hash,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["book_id", "episode"],
+        set_={
+            "sub_title": stmt.excluded.sub_title,
+            "body": stmt.excluded.body,
+            "content_hash": stmt.excluded.content_hash,
+            "fetched_at": func.now(),
+        },
+    )
+    await db.execute(stmt)
+    await db.commit()
+
+
+async def get_toc(db: AsyncSession, book_id: str) -> Toc:
+    """指定されたbook_idに対応する保存済みの目次情報を返す関数."""
+    result = await db.execute(select(Toc).where(Toc.book_id == book_id))
+
+    return result.scalar_one_or_none()
+
+
+async def save_toc(
+    db: AsyncSession,
+    book_id: str,
+    episode_count: int,
+    general_lastup: str,
+    pages: list,
+):
+    """指定されたbook_idに対応する目次情報を保存する。保存済みの場合は更新する."""
+    stmt = insert(Toc).values(
+        book_id=book_id,
+        episode_count=episode_count,
+        general_lastup=general_lastup,
+        pages=pages,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["book_id"],
+        set_={
+            "episode_count": stmt.excluded.episode_count,
+            "general_lastup": stmt.excluded.general_lastup,
+            "pages": stmt.excluded.pages,
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(stmt)
+    await db.commit()
+
+
+async def get_most_followed_books(db: AsyncSession, limit: int) -> list:
+    """お気に入り登録数の多い順に小説のbook_idとncodeを返す関数."""
+    result = await db.execute(
+        select(Book.id, Book.ncode)
+        .join(Follow, Follow.book_id == Book.id)
+        .group_by(Book.id, Book.ncode)
+        .order_by(func.count(Follow.user_id).desc(), Book.id)
+        .limit(limit)
+    )
+
+    return result.all()
+
+
+async def get_follow_books(db: AsyncSession, user_id: str) -> list:
+    """お気に入りの小説と既読話数(未読の場合はNone)を返す関数."""
+    result = await db.execute(
+        select(Book, ReadHistory.read_episode)
+        .join(Follow, Follow.book_id == Book.id)
+        .outerjoin(
+            ReadHistory,
+            and_(
+                ReadHistory.book_id == Book.id,
+                ReadHistory.user_id == user_id,
+            ),
+        )
+        .where(Follow.user_id == user_id)
+        .order_by(Book.id)
+    )
+
+    return result.all()
+
+
+def _select_new_episode_books(user_id: str, *columns):
+    """既読話数より全話数の多いお気に入りの小説に絞り込んだSELECT文を返す関数."""
+    return (
+        select(*columns)
+        .select_from(Book)
+        .join(Follow, Follow.book_id == Book.id)
+        .outerjoin(
+            ReadHistory,
+            and_(
+                ReadHistory.book_id == Book.id,
+                ReadHistory.user_id == user_id,
+            ),
+        )
+        .where(
+            Follow.user_id == user_id,
+            Book.episode_count > func.coalesce(ReadHistory.read_episode, 0),
+        )
+    )
+
+
+async def get_new_episode_books(
+    db: AsyncSession, user_id: str, limit: int, offset: int
+) -> list:
+    """既読話数より全話数の多いお気に入りの小説を最終掲載日の新しい順に返す関数.
+
+    各行は(小説, 既読話数, 該当する小説の総数)で、既読情報が無い場合の既読話数は0とする。
+    """
+    read_episode = func.coalesce(ReadHistory.read_episode, 0)
+    result = await db.execute(
+        _select_new_episode_books(
+            user_id, Book, read_episode, func.count().over()
+        )
+        .order_by(Book.general_lastup.desc(), Book.id)
+        .limit(limit)
+        .offset(offset)
+    )
+
+    return result.all()
+
+
+async def count_new_episode_books(db: AsyncSession, user_id: str) -> int:
+    """既読話数より全話数の多いお気に入りの小説の総数を返す関数."""
+    result = await db.execute(_select_new_episode_books(user_id, func.count()))
+
+    return result.scalar_one()
+
+
+async def get_stale_followed_books(
+    db: AsyncSession, refreshed_before: datetime, limit: int
+) -> list:
+    """小説情報の更新日時が指定日時より前(未取得を含む)のお気に入り済みの小説を返す関数."""
+    result = await db.execute(
+        select(Book)
+        .where(
+            Book.id.in_(select(Follow.book_id)),
+            (Book.metadata_refreshed_at.is_(None))
+            | (Book.metadata_refreshed_at < refreshed_before),
+        )
+        .order_by(Book.metadata_refreshed_at.asc().nulls_first())
+        .limit(limit)
+    )
+
+    return result.scalars().all()
+
+
+async def update_books_metadata(db: AsyncSession, values: list) -> None:
+    """小説情報(idをキーとする辞書のリスト)をまとめて更新する関数."""
+    if not values:
+        return
+    await db.execute(update(Book), values)
+    await db.commit()
+
+
 async def get_user_by_email(db: AsyncSession, email: str) -> User:
     """指定されたメールアドレスに紐づくユーザー情報を返す関数."""
     result = await db.execute(
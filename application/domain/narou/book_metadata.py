@@ -0,0 +1,114 @@
+"""このモジュールは、DBに保存する小説情報(タイトル・作者名・全話数・最終掲載日)の更新機能を提供します."""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.config import SessionFactory
+from config.environment import cache_settings
+from crud import get_stale_followed_books, update_books_metadata
+from domain.narou.metadata import get_novel_data_batch
+from domain.narou.narou_data import NovelData
+from models.book import Book
+
+
+def is_book_metadata_stale(book: Book, now: datetime) -> bool:
+    """DBに保存した小説情報が未取得または有効期限切れかどうかを返す関数."""
+    ttl = timedelta(seconds=cache_settings.BOOK_METADATA_TTL_SECONDS)
+    return (
+        book.metadata_refreshed_at is None
+        or book.metadata_refreshed_at < now - ttl
+    )
+
+
+async def refresh_book_metadata(
+    db: AsyncSession, books: List[Book]
+) -> Dict[str, NovelData]:
+    """指定された小説の小説情報をなろうAPIからまとめて取得し、DBに保存する関数.
+
+    なろうAPIで取得できなかった小説は更新日時のみ更新する。
+
+    Parameters:
+    - db (AsyncSession): 非同期SQLAlchemyセッション。
+    - books (List[Book]): 更新対象の小説。
+
+    Returns:
+    - Dict[str, NovelData]: ncodeをキーとする取得した小説情報。
+    """
+    novels = await get_novel_data_batch(
+        [book.ncode for book in books], refresh=True
+    )
+    now = datetime.now(timezone.utc)
+    values = []
+    for book in books:
+        novel_data = novels.get(book.ncode)
+        if novel_data is None:
+            values.append({"id": book.id, "metadata_refreshed_at": now})
+            continue
+        values.append(
+            {
+                "id": book.id,
+                "title": novel_data.title,
+                "writer": novel_data.writer,
+                "episode_count": novel_data.general_all_no,
+                "general_lastup": novel_data.general_lastup,
+                "metadata_refreshed_at": now,
+            }
+        )
+    await update_books_metadata(db, values)
+    return novels
+
+
+class BookMetadataRefresher:
+    """お気に入り済みの小説情報を定期的に更新するクラス.
+
+    interval秒ごとに、interval秒以上前に更新した小説をまとめて更新する。
+    """
+
+    def __init__(self, interval: float, batch_limit: int):
+        """初期化."""
+        self.interval = interval
+        self.batch_limit = batch_limit
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """定期更新を開始."""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """定期更新を停止."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def refresh_stale_books(self) -> int:
+        """更新対象の小説情報を更新し、更新件数を返却."""
+        refreshed_before = datetime.now(timezone.utc) - timedelta(
+            seconds=self.interval
+        )
+        async_session = SessionFactory.create()
+        async with async_session() as db:
+            books = await get_stale_followed_books(
+                db, refreshed_before, self.batch_limit
+            )
+            if books:
+                await refresh_book_metadata(db, books)
+        return len(books)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh_stale_books()
+            except Exception as exc:
+                print(f"小説情報の更新に失敗しました: {exc}")
+            await asyncio.sleep(self.interval)
+
+
+book_refresher = BookMetadataRefresher(
+    interval=cache_settings.BOOK_REFRESH_INTERVAL_SECONDS,
+    batch_limit=cache_settings.BOOK_REFRESH_BATCH_LIMIT,
+)
+"""小説情報の定期更新"""
@@ -2,24 +2,29 @@
 
 特定の小説のお気に入り設定（フォロー）と解除（アンフォロー）の機能が含まれています。
 """
-from bs4 import BeautifulSoup
-from fastapi import status
+from datetime import datetime, timezone
+
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
 
 from apis.exception import ErrorHttpException
-from apis.request import request_get
-from apis.urls import Url
-from apis.user_agent import UserAgentManager
 from crud import (
+    count_new_episode_books,
     create_or_check_existing_follow,
     delete_follow_by_book_id,
     ensure_book_exists,
+    get_follow_books,
+    get_new_episode_books,
+)
+from domain.narou.book_metadata import (
+    is_book_metadata_stale,
+    refresh_book_metadata,
+)
+from schemas.follow import (
+    FollowResponse,
+    GetFollowResponse,
+    NewEpisodeItem,
+    NewEpisodesResponse,
 )
-from models.book import Book
-from models.follow import Follow
-from models.read_history import ReadHistory
-from schemas.follow import FollowResponse, GetFollowResponse
 
 
 async def post_follow(db: AsyncSession, ncode: str, user_id: str):
@@ -43,53 +48,78 @@ async def delete_follow(db: AsyncSession, ncode: str, user_id: str):
 
 
 async def get_follow(db: AsyncSession, user_id: str):
-    """お気に入り取得APIのロジック."""
-    # お気に入りの小説のbook.idを取得
-    query = select(Follow.book_id).where(Follow.user_id == user_id)
-    result = await db.execute(query)
-    ids = result.scalars().all()
-    if not ids:
-        return []
-
-    # ncodeを取得
-    query = select(Book).where(Book.id.in_(ids)).order_by(Book.id)
-    result = await db.execute(query)
-    books = result.scalars().all()
-
-    # 既読情報をDBから取得
-    query = select(ReadHistory).filter(
-        ReadHistory.book_id.in_(ids), ReadHistory.user_id == user_id
-    )
-    result = await db.execute(query)
-    read_histories = set(result.scalars().all())
-
-    # 小説家になろうから情報を取得
-    headers = UserAgentManager().get_random_user_headers()
-    result_response = []
-    for book in books:
-        ncode = book.ncode
-        novel_url = Url.NOVEL_URL.join(ncode)
-        response = request_get(novel_url, headers)
-        if response is None:
-            raise ErrorHttpException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                error="server_error",
-                error_description="小説情報の取得に失敗しました。",
-            )
-        soup = BeautifulSoup(response.text, "html.parser")
-        title = soup.find(class_="novel_title").get_text()
-        author = soup.find(class_="novel_writername").find("a").get_text()
-        read_history = tuple(
-            filter(lambda x: x.book_id == book.id, read_histories)
-        )
-        episode = 1
-        if read_history:
-            episode = read_history[0].read_episode
+    """お気に入り取得APIのロジック.
+
+    DBに保存した小説情報を1回のクエリで取得する。
+    未取得・有効期限切れの小説情報のみ、なろうAPIからまとめて取得し直す。
+    取得し直せなかった場合は、保存済みの小説情報を返却する(未保存の小説は除外)。
+    """
+    rows = await get_follow_books(db, user_id)
 
+    now = datetime.now(timezone.utc)
+    stale_books = [
+        book for book, _ in rows if is_book_metadata_stale(book, now)
+    ]
+    novels = {}
+    refreshed = False
+    if stale_books:
+        try:
+            novels = await refresh_book_metadata(db, stale_books)
+            refreshed = True
+        except ErrorHttpException as exc:
+            # なろうAPIに接続できない場合は、DBに保存済みの小説情報で返却する
+            print(f"小説情報の更新に失敗しました: {exc.detail}")
+
+    result_response = []
+    for book, read_episode in rows:
+        novel_data = novels.get(book.ncode)
+        if novel_data is not None:
+            title, author = novel_data.title, novel_data.writer
+            episode_count = novel_data.general_all_no
+        elif book.title is None or (refreshed and book in stale_books):
+            # 小説情報が未保存のものや、削除された小説など取得できないものは除外
+            continue
+        else:
+            title, author = book.title, book.writer
+            episode_count = book.episode_count
         result_response.append(
             GetFollowResponse(
-                ncode=ncode, title=title, author=author, read_episode=episode
+                ncode=book.ncode,
+                title=title,
+                author=author,
+                episode_count=episode_count,
+                read_episode=read_episode or 1,
             )
         )
 
     return result_response
+
+
+async def get_new_episodes(
+    db: AsyncSession, user_id: str, limit: int, offset: int
+) -> NewEpisodesResponse:
+    """新着話取得APIのロジック.
+
+    DBに保存した小説情報(定期更新される全話数)と既読情報を1回のクエリで突き合わせる。
+    """
+    rows = await get_new_episode_books(db, user_id, limit, offset)
+    items = [
+        NewEpisodeItem(
+            ncode=book.ncode,
+            title=book.title,
+            author=book.writer,
+            episode_count=book.episode_count,
+            read_episode=read_episode,
+            unread_count=book.episode_count - read_episode,
+            updated_at=book.general_lastup,
+        )
+        for book, read_episode, _ in rows
+    ]
+    if rows:
+        total = rows[0][2]
+    elif offset > 0:
+        # 総数は各行に付与されるため、範囲外のページでは別途数える
+        total = await count_new_episode_books(db, user_id)
+    else:
+        total = 0
+    return NewEpisodesResponse(total=total, items=items)
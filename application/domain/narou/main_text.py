@@ -1,95 +1,241 @@
 """小説取得API."""
-from bs4 import BeautifulSoup
+import hashlib
+import json
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, List, Optional, Tuple
+
 from fastapi import Depends, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from apis.cache import CacheNamespace
 from apis.exception import ErrorHttpException
 from apis.request import request_get
+from apis.single_flight import SingleFlight, make_key
 from apis.urls import Url
 from apis.user_agent import UserAgentManager
-from config.config import get_async_session
-from crud import ensure_book_exists, update_or_create_read_history
-from domain.narou.narou_data import NarouData
+from config.config import SessionFactory, get_async_session
+from config.environment import cache_settings
+from crud import (
+    ensure_book_exists,
+    get_episode,
+    save_episode,
+    update_or_create_read_history,
+)
+from domain.narou.metadata import get_novel_data
+from domain.narou.narou_data import NovelData
+from domain.narou.parse_executor import parse_episode_content, parse_executor
 from schemas.novel import NovelResponse
 
+STREAM_LINES_PER_CHUNK = 20
+"""NDJSON形式で本文を送る際に1回にまとめて送る行数"""
 
-async def get_main_text(
-    ncode: str,
-    episode: int,
-    user_id: str,
-    db: AsyncSession = Depends(get_async_session),
-) -> dict:
-    """指定されたncode(小説コード)とepisode(話数)の小説本文をスクレイピングで取得する関数.
+_episode_flight = SingleFlight()
+"""本文取得の重複実行を抑止"""
+
+_episode_cache = CacheNamespace(
+    "episode",
+    ttl=cache_settings.EPISODE_CACHE_TTL_SECONDS,
+    maxsize=cache_settings.EPISODE_CACHE_MAX_ENTRIES,
+    dumps=list,
+    loads=tuple,
+)
+"""解析済みの本文のキャッシュ(キーは"ncode:episode")"""
+
+_confirmed_episode_count_cache = CacheNamespace(
+    "confirmed_episode_count",
+    ttl=cache_settings.NEGATIVE_CACHE_TTL_SECONDS,
+    maxsize=cache_settings.NEGATIVE_CACHE_MAX_ENTRIES,
+)
+"""なろうAPIから取得し直して確認した全話数のキャッシュ(キーは小文字のncode)
+
+有効期限内は全話数を超える(存在しない)話を、なろうAPIへの通信を行わずにエラーとする。
+"""
+
+
+async def parse_episode(content: bytes, encoding: str) -> Tuple[str, List[str]]:
+    """本文ページのHTMLからサブタイトルと本文(行単位)を抽出する関数.
+
+    解析はHTML解析用のプロセスプールで行う。
 
     Parameters:
-    - ncode (str): スクレイピング対象の小説のNコード。
-    - episodes (int): 小説のエピソード。
+    - content (bytes): 本文ページのHTML。
+    - encoding (str): HTMLの文字コード。
+
     Returns:
-    - dict: 小説のタイトル、サブタイトル、本文(リスト形式)、次話・全話有無を含む辞書。
+    - Tuple[str, List[str]]: サブタイトルと本文(リスト形式)。
     """
-    # t-ga：小説名、全話数を出力
-    payload = {
-        "of": "t-ga",
-        "ncode": {ncode},
-        "lim": 1,
-        "out": "json",
-    }
-    response = request_get(Url.API_URL.value, payload=payload)
-    json_data = NarouData(response)
-
-    all_count = json_data.count.allcount
-    novel_data = json_data.novel_data
-
-    if novel_data is None:
-        raise ErrorHttpException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            error="invalid_parameter",
-            error_description="Nコードか話数が存在しません。",
-        )
-
-    # 不正なnコードかどうかのチェック・存在しないエピソードかどうかのチェック
-    # all_count(検索ヒット数)とlimit数が一致していない場合はエラーを返す
-    # フロントから渡された話数と全話数が一致していない場合はエラーを返す
-    if not all_count == 1 or episode > novel_data.general_all_no:
+    sub_title, honbun = await parse_executor.run(
+        parse_episode_content, content, encoding
+    )
+    if sub_title is None or honbun is None:
         raise ErrorHttpException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            error="invalid_parameter",
-            error_description="Nコードか話数が存在しません。",
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            error="server_error",
+            error_description="本文取得を失敗しました。",
         )
 
-    next_episode = not episode == novel_data.general_all_no
-    prev_episode = episode > 1
+    honbun += "\n"
+    return sub_title, honbun.split("\n")
 
-    novel_url = Url.NOVEL_URL.join(ncode, str(episode))
 
+async def _fetch_episode(novel_url: str) -> Tuple[str, List[str]]:
     # ユーザーエージェントを設定
     ua_manager = UserAgentManager()
     headers = ua_manager.get_random_user_headers()
 
-    novel_response = request_get(novel_url, headers, payload)
+    novel_response = await request_get(novel_url, headers)
     if novel_response is None:
         raise ErrorHttpException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             error="server_error",
             error_description="本文取得を失敗しました。",
         )
-    soup = BeautifulSoup(novel_response.text, "html.parser")
+    return await parse_episode(
+        novel_response.content, novel_response.encoding or "utf-8"
+    )
 
-    novel_subtitle = soup.select_one("p.novel_subtitle")
-    if novel_subtitle is None:
-        raise ErrorHttpException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            error="server_error",
-            error_description="本文取得を失敗しました。",
-        )
-    sub_title = novel_subtitle.text
 
-    honbun = soup.select_one("#novel_honbun").text
-    honbun += "\n"
-    result_list = honbun.split("\n")
+async def fetch_episode(ncode: str, episode: int) -> Tuple[str, List[str]]:
+    """指定されたncode(小説コード)とepisode(話数)の本文をスクレイピングで取得する関数.
+
+    同じ話を同時に要求された場合、なろうへの通信と解析は1回だけ行い結果を共有する。
+
+    Returns:
+    - Tuple[str, List[str]]: サブタイトルと本文(リスト形式)。
+    """
+    novel_url = Url.NOVEL_URL.join(ncode, str(episode))
+    return await _episode_flight.do(
+        make_key(novel_url), lambda: _fetch_episode(novel_url)
+    )
+
+
+def compress_episode(sub_title: str, lines: List[str]) -> Tuple[bytes, str]:
+    """本文を圧縮し、内容のハッシュ値と合わせて返す関数.
+
+    Returns:
+    - Tuple[bytes, str]: zlib圧縮した本文とSHA-256のハッシュ値(16進数)。
+    """
+    text = "\n".join(lines).encode("utf-8")
+    content_hash = hashlib.sha256(sub_title.encode("utf-8") + b"\0" + text)
+    return zlib.compress(text), content_hash.hexdigest()
+
+
+def decompress_episode(body: bytes) -> List[str]:
+    """compress_episodeで圧縮した本文を行単位のリストに戻す関数."""
+    return zlib.decompress(body).decode("utf-8").split("\n")
+
+
+async def is_episode_cached(ncode: str, episode: int) -> bool:
+    """指定された話の本文がキャッシュ済みかどうかを返す関数."""
+    return await _episode_cache.exists(f"{ncode}:{episode}")
+
+
+async def _lookup_episode(
+    db: AsyncSession, book_id: str, ncode: str, episode: int
+) -> Optional[Tuple[str, List[str]]]:
+    """本文をキャッシュ・DBから取得する関数(どちらにも無い場合はNone).
+
+    DBに保存済みでも、保存から一定期間経過したものは無いものとして扱う。
+    """
+    key = f"{ncode}:{episode}"
+    cached = await _episode_cache.get(key)
+    if cached is not None:
+        return cached
+
+    stored = await get_episode(db, book_id, episode)
+    expires = timedelta(days=cache_settings.EPISODE_STORE_TTL_DAYS)
+    if stored is None or stored.fetched_at + expires <= datetime.now(
+        timezone.utc
+    ):
+        return None
+    result = (stored.sub_title, decompress_episode(stored.body))
+    await _episode_cache.set(key, result)
+    return result
+
+
+async def _save_fetched_episode(
+    db: AsyncSession, book_id: str, episode: int, result: Tuple[str, List[str]]
+) -> None:
+    """スクレイピングで取得した本文をDBに保存する関数."""
+    body, content_hash = compress_episode(*result)
+    await save_episode(db, book_id, episode, result[0], body, content_hash)
+
+
+async def load_episode(
+    db: AsyncSession, book_id: str, ncode: str, episode: int
+) -> Tuple[str, List[str]]:
+    """本文をキャッシュ・DB・スクレイピングの順に取得する関数.
+
+    インメモリのキャッシュに無い場合はDBに保存済みの本文を利用し、
+    DBにも無い(または保存から一定期間経過した)場合はスクレイピングで取得してDBに保存する。
+
+    Returns:
+    - Tuple[str, List[str]]: サブタイトルと本文(リスト形式)。
+    """
+    result = await _lookup_episode(db, book_id, ncode, episode)
+    if result is None:
+        result = await fetch_episode(ncode, episode)
+        await _save_fetched_episode(db, book_id, episode, result)
+        await _episode_cache.set(f"{ncode}:{episode}", result)
+    return result
+
+
+async def _check_episode(
+    ncode: str, episode: int, db: AsyncSession
+) -> Tuple[NovelData, str]:
+    """存在チェックを行い、小説情報とbook_idを返す関数."""
+    invalid_parameter = ErrorHttpException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        error="invalid_parameter",
+        error_description="Nコードか話数が存在しません。",
+    )
+    # 全話数を確認済みの場合、それを超える話はなろうAPIへの通信を行わずにエラーを返す
+    count_key = ncode.lower()
+    confirmed_count = await _confirmed_episode_count_cache.get(count_key)
+    if confirmed_count is not None and episode > confirmed_count:
+        raise invalid_parameter
+
+    novel_data = await get_novel_data(ncode)
+    if (
+        novel_data is not None
+        and episode > novel_data.general_all_no
+        and confirmed_count is None
+    ):
+        # キャッシュ後に新しい話が掲載された可能性があるため取得し直す
+        novel_data = await get_novel_data(ncode, refresh=True)
+        if novel_data is not None:
+            await _confirmed_episode_count_cache.set(
+                count_key, novel_data.general_all_no
+            )
+
+    # 不正なnコードかどうかのチェック・存在しないエピソードかどうかのチェック
+    # フロントから渡された話数と全話数が一致していない場合はエラーを返す
+    if novel_data is None or episode > novel_data.general_all_no:
+        raise invalid_parameter
 
     # 非同期データベースクエリを実行してbook_idを取得
     book_id = await ensure_book_exists(db, ncode)
+    return novel_data, book_id
+
+
+async def get_main_text(
+    ncode: str,
+    episode: int,
+    user_id: str,
+    db: AsyncSession = Depends(get_async_session),
+) -> dict:
+    """指定されたncode(小説コード)とepisode(話数)の小説本文をスクレイピングで取得する関数.
+
+    Parameters:
+    - ncode (str): スクレイピング対象の小説のNコード。
+    - episodes (int): 小説のエピソード。
+    Returns:
+    - dict: 小説のタイトル、サブタイトル、本文(リスト形式)、次話・全話有無を含む辞書。
+    """
+    novel_data, book_id = await _check_episode(ncode, episode, db)
+    # 本文を取得(キャッシュ・DBに無い場合はスクレイピング)
+    sub_title, result_list = await load_episode(db, book_id, ncode, episode)
     # 指定されたbook_idに対応する既読情報を更新
     await update_or_create_read_history(db, user_id, book_id, episode)
 
@@ -97,8 +243,70 @@ async def get_main_text(
         title=novel_data.title,
         sub_title=sub_title,
         main_text=result_list,
-        next=next_episode,
-        prev=prev_episode,
+        next=not episode == novel_data.general_all_no,
+        prev=episode > 1,
     )
 
     return novel
+
+
+def _ndjson(data: dict) -> str:
+    return json.dumps(data, ensure_ascii=False) + "\n"
+
+
+async def stream_main_text(
+    ncode: str, episode: int, user_id: str, db: AsyncSession
+) -> Tuple[AsyncIterator[bytes], bool]:
+    """指定されたncodeとepisodeの小説本文をNDJSON形式で逐次返すジェネレーターを返す関数.
+
+    存在チェックと本文の取得・解析はジェネレーターを返す前に行い、エラーは通常のレスポンスとする。
+    キャッシュ・DBに無い場合、最初の行はなろうからの取得と解析の完了を待つ(ページは逐次解析しない)。
+    取得した本文のDBへの保存と既読情報の更新は、全行を送り終えた後に行う
+    (途中で切断された場合は行わない)。
+    1行目にヘッダー(type=header: タイトル・サブタイトル・前後話の有無)、
+    以降に本文(type=paragraph: 1行ずつ)をSTREAM_LINES_PER_CHUNK行ごとにまとめて送る。
+
+    Parameters:
+    - ncode (str): 小説のNコード。
+    - episode (int): 小説のエピソード。
+    - user_id (str): ユーザーID。
+    - db (AsyncSession): 非同期SQLAlchemyセッション。
+
+    Returns:
+    - Tuple[AsyncIterator[bytes], bool]: NDJSON形式の本文と次話の有無。
+    """
+    novel_data, book_id = await _check_episode(ncode, episode, db)
+    fetched = None
+    result = await _lookup_episode(db, book_id, ncode, episode)
+    if result is None:
+        result = fetched = await fetch_episode(ncode, episode)
+        await _episode_cache.set(f"{ncode}:{episode}", result)
+    sub_title, result_list = result
+
+    has_next = not episode == novel_data.general_all_no
+
+    async def generate() -> AsyncIterator[bytes]:
+        header = {
+            "type": "header",
+            "title": novel_data.title,
+            "sub_title": sub_title,
+            "prev": episode > 1,
+            "next": has_next,
+        }
+        yield _ndjson(header).encode("utf-8")
+        for start in range(0, len(result_list), STREAM_LINES_PER_CHUNK):
+            lines = result_list[start : start + STREAM_LINES_PER_CHUNK]
+            yield "".join(
+                _ndjson({"type": "paragraph", "text": line}) for line in lines
+            ).encode("utf-8")
+
+        # レスポンスの送信中はリクエストのセッションに依存しないよう、別のセッションで更新
+        async_session = SessionFactory.create()
+        async with async_session() as session:
+            if fetched is not None:
+                await _save_fetched_episode(session, book_id, episode, fetched)
+            await update_or_create_read_history(
+                session, user_id, book_id, episode
+            )
+
+    return generate(), has_next
@@ -0,0 +1,164 @@
+"""このモジュールは、なろうAPIから取得した小説情報(メタデータ)をキャッシュして提供します."""
+import asyncio
+from dataclasses import asdict
+from typing import Dict, List, Optional
+
+from fastapi import status
+
+from apis.cache import CacheNamespace
+from apis.exception import ErrorHttpException
+from apis.request import request_get
+from apis.single_flight import SingleFlight, make_key
+from apis.urls import Url
+from config.environment import cache_settings, http_settings
+from domain.narou.narou_data import NarouData, NovelData
+
+NOVEL_DATA_FIELDS = "t-ga-w-gf-k-s-bg-g-gl"
+"""なろうAPIから取得する項目(NovelDataの全項目)"""
+
+
+def _api_payload(**params) -> dict:
+    """なろうAPIのパラメータに出力形式(JSON)と圧縮の指定を付与して返却."""
+    payload = {**params, "out": "json"}
+    if http_settings.NAROU_API_GZIP_LEVEL:
+        payload["gzip"] = http_settings.NAROU_API_GZIP_LEVEL
+    return payload
+
+
+_metadata_flight = SingleFlight()
+"""小説情報取得の重複実行を抑止"""
+
+_metadata_cache = CacheNamespace(
+    "metadata",
+    ttl=cache_settings.METADATA_CACHE_TTL_SECONDS,
+    maxsize=cache_settings.METADATA_CACHE_MAX_ENTRIES,
+    dumps=asdict,
+    loads=lambda data: NovelData(**data),
+)
+"""小説情報のキャッシュ(キーはncode)"""
+
+_missing_ncode_cache = CacheNamespace(
+    "missing_ncode",
+    ttl=cache_settings.NEGATIVE_CACHE_TTL_SECONDS,
+    maxsize=cache_settings.NEGATIVE_CACHE_MAX_ENTRIES,
+)
+"""存在しないNコードのキャッシュ(キーは小文字のncode)"""
+
+
+async def _fetch_novel_data(payload: dict) -> Optional[NovelData]:
+    response = await request_get(Url.API_URL.value, payload=payload)
+    if response is None:
+        raise ErrorHttpException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            error="server_error",
+            error_description="小説情報の取得に失敗しました。",
+        )
+    data = NarouData(response)
+    # all_count(検索ヒット数)とlimit数が一致していない場合は存在しないNコード
+    if data.novel_data is None or not data.count.allcount == 1:
+        return None
+    return data.novel_data
+
+
+async def store_novel_data(ncode: str, novel_data: NovelData) -> None:
+    """取得した小説情報をキャッシュに格納する関数."""
+    await _metadata_cache.set(ncode, novel_data)
+
+
+async def get_novel_data(
+    ncode: str, refresh: bool = False
+) -> Optional[NovelData]:
+    """指定されたncodeの小説情報を取得する関数.
+
+    キャッシュの有効期限内であればなろうAPIへの通信を行わずに返す。
+    存在しないNコードも短い期間キャッシュし、その間はなろうAPIへの通信を行わない。
+
+    Parameters:
+    - ncode (str): 小説のNコード。
+    - refresh (bool): Trueの場合はキャッシュを使わずになろうAPIから取得し直す。
+
+    Returns:
+    - NovelData|None: 小説情報。Nコードが存在しない場合はNone。
+    """
+    if await _missing_ncode_cache.exists(ncode.lower()):
+        return None
+    if not refresh:
+        cached = await _metadata_cache.get(ncode)
+        if cached is not None:
+            return cached
+
+    payload = _api_payload(of=NOVEL_DATA_FIELDS, ncode=ncode, lim=1)
+    novel_data = await _metadata_flight.do(
+        make_key(Url.API_URL.value, payload),
+        lambda: _fetch_novel_data(payload),
+    )
+    if novel_data is None:
+        await _missing_ncode_cache.set(ncode.lower(), True)
+    else:
+        await store_novel_data(ncode, novel_data)
+    return novel_data
+
+
+async def _fetch_novel_data_batch(ncodes: List[str]) -> List[NovelData]:
+    payload = _api_payload(
+        of=f"{NOVEL_DATA_FIELDS}-n", ncode="-".join(ncodes), lim=len(ncodes)
+    )
+    response = await request_get(Url.API_URL.value, payload=payload)
+    if response is None:
+        raise ErrorHttpException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            error="server_error",
+            error_description="小説情報の取得に失敗しました。",
+        )
+    return NarouData(response).novels
+
+
+async def get_novel_data_batch(
+    ncodes: List[str], refresh: bool = False
+) -> Dict[str, NovelData]:
+    """複数のncodeの小説情報をまとめて取得する関数.
+
+    キャッシュに無いものだけを、なろうAPIのncode指定(ハイフン区切り)で
+    NAROU_API_BATCH_SIZE件ずつまとめて取得する。取得した小説情報はキャッシュに格納する。
+
+    Parameters:
+    - ncodes (List[str]): 小説のNコードのリスト。
+    - refresh (bool): Trueの場合はキャッシュを使わずになろうAPIから取得し直す。
+
+    Returns:
+    - Dict[str, NovelData]: ncodeをキーとする小説情報。存在しないNコードは含まない。
+    """
+    result = {}
+    missing = []
+    for ncode in ncodes:
+        if await _missing_ncode_cache.exists(ncode.lower()):
+            continue
+        cached = None if refresh else await _metadata_cache.get(ncode)
+        if cached is not None:
+            result[ncode] = cached
+        else:
+            missing.append(ncode)
+    if not missing:
+        return result
+
+    size = http_settings.NAROU_API_BATCH_SIZE
+    batches = await asyncio.gather(
+        *(
+            _fetch_novel_data_batch(missing[i : i + size])
+            for i in range(0, len(missing), size)
+        )
+    )
+    # なろうAPIはNコードを大文字で返すため、小文字で突き合わせる
+    fetched = {
+        novel_data.ncode.lower(): novel_data
+        for batch in batches
+        for novel_data in batch
+    }
+    for ncode in missing:
+        novel_data = fetched.get(ncode.lower())
+        if novel_data is None:
+            await _missing_ncode_cache.set(ncode.lower(), True)
+            continue
+        await store_novel_data(ncode, novel_data)
+        result[ncode] = novel_data
+    return result
@@ -1,9 +1,50 @@
 """このモジュールは、小説家になろうAPIから取得したデータを扱うためのクラスとデータ構造を定義しています."""
 
-from dataclasses import dataclass
-from typing import Any, Dict, Optional
+import json
+import zlib
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
 
-from requests.models import Response
+from httpx import Response
+
+GZIP_MAGIC = b"\x1f\x8b"
+"""gzip形式の先頭バイト"""
+
+
+@dataclass
+class NarouApiStats:
+    """なろうAPIのレスポンスサイズ(メトリクス)."""
+
+    responses: int = 0
+    """レスポンス数"""
+    wire_bytes: int = 0
+    """受信したバイト数の合計"""
+    decoded_bytes: int = 0
+    """展開後のバイト数の合計"""
+
+    @property
+    def bytes_saved(self) -> int:
+        """圧縮により削減したバイト数."""
+        return self.decoded_bytes - self.wire_bytes
+
+
+_stats = NarouApiStats()
+
+
+def decode_payload(content: bytes) -> bytes:
+    """なろうAPIのレスポンス本文を返却(gzip圧縮されている場合は展開)."""
+    _stats.responses += 1
+    _stats.wire_bytes += len(content)
+    if content[:2] == GZIP_MAGIC:
+        # wbits=31: gzipヘッダー付きの形式として展開
+        content = zlib.decompress(content, wbits=31)
+    _stats.decoded_bytes += len(content)
+    return content
+
+
+def get_narou_api_stats() -> dict:
+    """なろうAPIのレスポンスサイズ(メトリクス)を返却."""
+    return {**asdict(_stats), "bytes_saved": _stats.bytes_saved}
 
 
 @dataclass
@@ -26,6 +67,7 @@ class NovelData:
     biggenre: int = 0
     genre: int = 0
     general_lastup: str = ""
+    ncode: str = ""
 
 
 class NarouData:
@@ -35,18 +77,21 @@ class NarouData:
         """NarouDataクラスのコンストラクタ.
 
         引数:
-            response (Response): なろうAPIからのレスポンス。
+            response (Response): なろうAPIからのレスポンス(gzip圧縮されていても可)。
 
         処理:
             レスポンスから必要なデータを抽出し、CountとNovelDataのインスタンスを生成する。
+            novel_dataには1件目、novelsには全件の小説情報を格納する。
             エラーが発生した場合はメッセージを表示し、属性をNoneに設定する。
         """
         self.count: Optional[Count] = None
         self.novel_data: Optional[NovelData] = None
+        self.novels: List[NovelData] = []
 
         try:
-            data: Dict[str, Any] = response.json()
+            data: Dict[str, Any] = json.loads(decode_payload(response.content))
             self.count = Count(**data[0])
-            self.novel_data = NovelData(**data[1])
-        except (KeyError, IndexError, TypeError) as e:
+            self.novels = [NovelData(**novel) for novel in data[1:]]
+            self.novel_data = self.novels[0]
+        except (KeyError, IndexError, TypeError, ValueError, zlib.error) as e:
             print(f"Error processing response data: {e}")
@@ -1,80 +1,93 @@
 """このモジュールは、小説家になろうのAPIおよびウェブサイトから小説情報を取得し、整形して返すための機能を提供します."""
-from bs4 import BeautifulSoup
+import asyncio
+from typing import Iterable, List, Optional, Tuple
+
 from fastapi import status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from apis.cache import CacheNamespace
 from apis.exception import ErrorHttpException
 from apis.request import request_get
+from apis.single_flight import SingleFlight, make_key
 from apis.urls import Url
 from apis.user_agent import UserAgentManager
+from config.environment import cache_settings, http_settings
 from crud import (
     check_follow_exists_by_book_id,
     ensure_book_exists,
     get_latest_read_episode_by_book_id,
+    get_toc,
+    save_toc,
 )
 from domain.narou.common import BigGenre, Genre
-from domain.narou.narou_data import NarouData
+from domain.narou.metadata import get_novel_data
+from domain.narou.narou_data import NovelData
+from domain.narou.parse_executor import parse_executor, parse_toc_content
+from domain.narou.parser import CHAPTER
 from schemas.novel import NovelInfoResponse
 
+_toc_flight = SingleFlight()
+"""目次ページ取得の重複実行を抑止"""
+
+_toc_cache = CacheNamespace(
+    "toc",
+    ttl=cache_settings.TOC_CACHE_TTL_SECONDS,
+    maxsize=cache_settings.TOC_CACHE_MAX_ENTRIES,
+)
+"""目次のキャッシュ(キーはncode、値は話数・最終掲載日・ページごとの目次)"""
+
+TOC_PAGE_SIZE = 100
+"""目次1ページあたりの話数"""
+TOC_CHAPTER_LOOKBACK_PAGES = 1
+"""範囲指定で目次を取得する際に、章題を探すため遡って読み込むページ数の上限"""
 
-def scrape_narou_chapters(ncode: str, total_episodes: int) -> list:
-    """指定されたncodeの小説の目次情報をスクレイピングで取得する関数.
+
+async def parse_toc_page(
+    content: bytes, encoding: str
+) -> List[Tuple[str, str]]:
+    """目次ページのHTMLから章題とサブタイトルを出現順に抽出する関数.
+
+    解析はHTML解析用のプロセスプールで行う。
 
     Parameters:
-    - ncode (str): スクレイピング対象の小説のNコード。
-    - total_episodes (int): 小説の総エピソード数。
+    - content (bytes): 目次ページのHTML。
+    - encoding (str): HTMLの文字コード。
 
     Returns:
-    - list: 各章のタイトルとその下のサブタイトルのリストを含む辞書のリスト。
+    - List[Tuple[str, str]]: 要素種別(CHAPTER/SUBTITLE)とテキストのタプルのリスト。
     """
-    # 総エピソード数を基にページ数を計算
-    quotient, remainder = divmod(total_episodes, 100)
-    page_count = quotient + (1 if remainder > 0 else 0)
+    return await parse_executor.run(parse_toc_content, content, encoding)
+
+
+def build_chapters(items: Iterable[Tuple[str, str]]) -> list:
+    """目次の要素を章ごとにまとめる関数.
+
+    ページをまたいで同じ章題が続く場合は1つの章として扱う。
 
-    # Response用の変数を準備
+    Parameters:
+    - items (Iterable[Tuple[str, str]]): parse_toc_pageで抽出した要素(全ページ分)。
+
+    Returns:
+    - list: 各章のタイトルとその下のサブタイトルのリストを含む辞書のリスト。
+    """
     chapters = []
     last_chapter_title = ""
     sub_titles = []
 
-    # ユーザーエージェントを設定
-    ua_manager = UserAgentManager()
-    headers = ua_manager.get_random_user_headers()
-
-    # 指定されたページ数だけループして目次情報を取得
-    for page in range(1, page_count + 1):
-        payload = {
-            "ncode": {ncode},
-            "p": {page},
-        }
-        resp = request_get(
-            Url.NOVEL_URL.value, headers=headers, payload=payload
-        )
-        if resp is None:
-            raise ErrorHttpException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                error="invalid_parameter",
-                error_description="ページが存在しません。",
-            )
-
-        soup = BeautifulSoup(resp.content, "html.parser")
-
-        for child in soup.select(".index_box > *"):
-            if "chapter_title" in child.get("class", []):
-                chapter_title = child.get_text(strip=True)
-                if chapter_title != last_chapter_title:
-                    if last_chapter_title or sub_titles:
-                        chapters.append(
-                            {
-                                "chapter_title": last_chapter_title,
-                                "sub_titles": sub_titles,
-                            }
-                        )
-                        sub_titles = []
-                    last_chapter_title = chapter_title
-            elif "novel_sublist2" in child.get("class", []):
-                for sub in child.select(".subtitle"):
-                    clean_subtitle = sub.get_text(strip=True).replace("\n", "")
-                    sub_titles.append(clean_subtitle)
+    for kind, text in items:
+        if kind == CHAPTER:
+            if text != last_chapter_title:
+                if last_chapter_title or sub_titles:
+                    chapters.append(
+                        {
+                            "chapter_title": last_chapter_title,
+                            "sub_titles": sub_titles,
+                        }
+                    )
+                    sub_titles = []
+                last_chapter_title = text
+        else:
+            sub_titles.append(text)
 
     # 最後の章をリストに追加
     if last_chapter_title or sub_titles:
@@ -88,24 +101,316 @@ def scrape_narou_chapters(ncode: str, total_episodes: int) -> list:
     return chapters
 
 
-async def get_novel_info(db: AsyncSession, ncode: str, user_id: int):
+async def _fetch_toc_page(
+    payload: dict, headers: dict
+) -> List[Tuple[str, str]]:
+    resp = await request_get(
+        Url.NOVEL_URL.value, headers=headers, payload=payload
+    )
+    if resp is None:
+        raise ErrorHttpException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            error="invalid_parameter",
+            error_description="ページが存在しません。",
+        )
+    return await parse_toc_page(resp.content, resp.encoding or "utf-8")
+
+
+async def fetch_toc_page(
+    ncode: str, page: int, headers: dict
+) -> List[Tuple[str, str]]:
+    """指定されたncodeの小説の目次ページ(1ページ分)をスクレイピングで取得する関数.
+
+    同じページを同時に要求された場合、なろうへの通信と解析は1回だけ行い結果を共有する。
+    """
+    payload = {
+        "ncode": ncode,
+        "p": page,
+    }
+    return await _toc_flight.do(
+        make_key(Url.NOVEL_URL.value, payload),
+        lambda: _fetch_toc_page(payload, headers),
+    )
+
+
+def count_toc_pages(total_episodes: int) -> int:
+    """総エピソード数から目次のページ数を計算する関数."""
+    quotient, remainder = divmod(total_episodes, TOC_PAGE_SIZE)
+    return quotient + (1 if remainder > 0 else 0)
+
+
+async def scrape_toc_pages(
+    ncode: str, page_numbers: List[int]
+) -> List[List[Tuple[str, str]]]:
+    """指定されたncodeの小説の目次ページ(page_numbersのページ)をスクレイピングで取得する関数.
+
+    ページはTOC_FETCH_CONCURRENCYずつ並行して取得し、page_numbersの順に並べて返す。
+    接続先ホストごとの流量制御は個々のリクエストで適用される。
+
+    Returns:
+    - List[List[Tuple[str, str]]]: ページごとの目次の要素(parse_toc_pageの結果)のリスト。
+    """
+    # ユーザーエージェントを設定
+    ua_manager = UserAgentManager()
+    headers = ua_manager.get_random_user_headers()
+
+    semaphore = asyncio.Semaphore(http_settings.TOC_FETCH_CONCURRENCY)
+
+    async def fetch(page: int) -> List[Tuple[str, str]]:
+        async with semaphore:
+            return await fetch_toc_page(ncode, page, headers)
+
+    # gatherの結果は引数の順(ページ順)に並ぶ
+    return await asyncio.gather(*(fetch(page) for page in page_numbers))
+
+
+def _is_current_toc(toc: Optional[dict], novel_data: NovelData) -> bool:
+    """目次の話数・最終掲載日が小説情報と一致しているかどうかを返す関数."""
+    return (
+        toc is not None
+        and toc["episode_count"] == novel_data.general_all_no
+        and toc["general_lastup"] == novel_data.general_lastup
+    )
+
+
+def _leading_chapter(
+    pages: list, first_episode: int
+) -> Optional[Tuple[str, str]]:
+    """first_episode話の時点の章題を、読み込み済みのページから探して返す関数.
+
+    章題が見つからない場合(章題のない小説や、前のページを読み込んでいない場合)はNoneを返す。
+    """
+    first_page = count_toc_pages(first_episode)
+    chapter = None
+    episode = (first_page - 1) * TOC_PAGE_SIZE
+    for kind, text in pages[first_page - 1] or []:
+        if kind == CHAPTER:
+            chapter = (kind, text)
+            continue
+        episode += 1
+        if episode >= first_episode:
+            break
+    if chapter is not None:
+        return chapter
+
+    for page in reversed(pages[: first_page - 1]):
+        if page is None:
+            break
+        for kind, text in reversed(page):
+            if kind == CHAPTER:
+                return kind, text
+    return None
+
+
+async def load_toc_pages(
+    db: AsyncSession,
+    book_id: str,
+    ncode: str,
+    novel_data: NovelData,
+    first_episode: int,
+    last_episode: int,
+) -> list:
+    """指定されたncodeの小説の目次のうち、first_episode〜last_episode話を含むページを読み込む関数.
+
+    キャッシュ・DBに保存した目次を基に、未取得のページと増えた話数を含むページ
+    (保存時の最終ページ以降)のうち、指定された範囲のページだけをスクレイピングで取得する。
+    first_episode話が章の途中の場合は、章題を探すため直前のページを
+    TOC_CHAPTER_LOOKBACK_PAGESページまで読み込む。
+    取得したページはキャッシュ・DBに保存する。
+
+    Parameters:
+    - db (AsyncSession): 非同期SQLAlchemyセッション。
+    - book_id (str): 小説のID。
+    - ncode (str): スクレイピング対象の小説のNコード。
+    - novel_data (NovelData): なろうAPIから取得した小説情報。
+    - first_episode (int): 範囲の最初の話数。
+    - last_episode (int): 範囲の最後の話数。
+
+    Returns:
+    - list: 全ページ分の目次の要素のリスト(読み込んでいないページはNone)。
+    """
+    total_episodes = novel_data.general_all_no
+    page_count = count_toc_pages(total_episodes)
+    first_page = count_toc_pages(first_episode)
+    last_page = min(count_toc_pages(last_episode), page_count)
+
+    toc = await _toc_cache.get(ncode)
+    cached = stored = _is_current_toc(toc, novel_data)
+    if not cached:
+        row = await get_toc(db, book_id)
+        toc = (
+            None
+            if row is None
+            else {
+                "episode_count": row.episode_count,
+                "general_lastup": row.general_lastup,
+                "pages": row.pages,
+            }
+        )
+        stored = _is_current_toc(toc, novel_data)
+
+    if stored:
+        pages = list(toc["pages"])
+    elif toc is not None and toc["episode_count"] <= total_episodes:
+        # 保存時の最終ページは話が追加・更新されている可能性があるため取得し直す
+        pages = toc["pages"][
+            : max(1, count_toc_pages(toc["episode_count"])) - 1
+        ]
+    else:
+        pages = []
+    pages = (pages + [None] * page_count)[:page_count]
+
+    missing = [
+        page
+        for page in range(first_page, last_page + 1)
+        if pages[page - 1] is None
+    ]
+    for page, items in zip(missing, await scrape_toc_pages(ncode, missing)):
+        pages[page - 1] = items
+
+    # 章の途中から始まる場合は、章題を探すため直前のページも読み込む
+    if (
+        1 < first_page <= last_page
+        and _leading_chapter(pages, first_episode) is None
+    ):
+        lookback = [
+            page
+            for page in range(
+                max(1, first_page - TOC_CHAPTER_LOOKBACK_PAGES), first_page
+            )
+            if pages[page - 1] is None
+        ]
+        for page, items in zip(
+            lookback, await scrape_toc_pages(ncode, lookback)
+        ):
+            pages[page - 1] = items
+        missing += lookback
+
+    if missing or not stored:
+        await save_toc(
+            db, book_id, total_episodes, novel_data.general_lastup, pages
+        )
+    if missing or not cached:
+        await _toc_cache.set(
+            ncode,
+            {
+                "episode_count": total_episodes,
+                "general_lastup": novel_data.general_lastup,
+                "pages": pages,
+            },
+        )
+    return pages
+
+
+async def load_chapters(
+    db: AsyncSession, book_id: str, ncode: str, novel_data: NovelData
+) -> list:
+    """指定されたncodeの小説の目次情報(全話)を取得する関数.
+
+    Parameters:
+    - db (AsyncSession): 非同期SQLAlchemyセッション。
+    - book_id (str): 小説のID。
+    - ncode (str): スクレイピング対象の小説のNコード。
+    - novel_data (NovelData): なろうAPIから取得した小説情報。
+
+    Returns:
+    - list: 各章のタイトルとその下のサブタイトルのリストを含む辞書のリスト。
+    """
+    pages = await load_toc_pages(
+        db, book_id, ncode, novel_data, 1, novel_data.general_all_no
+    )
+    return build_chapters(item for page in pages for item in page)
+
+
+def slice_chapters(pages: list, first_episode: int, last_episode: int) -> list:
+    """目次のページから指定した範囲(first_episode〜last_episode話)の章を抽出する関数.
+
+    範囲の先頭が章の途中の場合は、その章の章題を付ける。
+    読み込み済みのページから章題が分からない場合は章題を空文字とする。
+
+    Parameters:
+    - pages (list): load_toc_pagesで読み込んだ目次のページ。
+    - first_episode (int): 範囲の最初の話数。
+    - last_episode (int): 範囲の最後の話数。
+
+    Returns:
+    - list: 各章のタイトルとその下のサブタイトルのリストを含む辞書のリスト。
+    """
+    first_page = count_toc_pages(first_episode)
+    last_page = count_toc_pages(last_episode)
+
+    chapter = _leading_chapter(pages, first_episode)
+    items = []
+    episode = (first_page - 1) * TOC_PAGE_SIZE
+    for page in pages[first_page - 1 : last_page]:
+        for kind, text in page:
+            if kind == CHAPTER:
+                chapter = (kind, text)
+                continue
+            episode += 1
+            if first_episode <= episode <= last_episode:
+                # 範囲内の話を含む章の章題のみ出力する
+                if chapter is not None:
+                    items.append(chapter)
+                    chapter = None
+                items.append((kind, text))
+    return build_chapters(items)
+
+
+def get_toc_window(
+    total_episodes: int,
+    offset: Optional[int],
+    limit: Optional[int],
+    around: Optional[int],
+) -> Optional[Tuple[int, int]]:
+    """目次の取得範囲(最初と最後の話数)を計算する関数.
+
+    - aroundを指定した場合はaround話を中心にlimit話分(offsetは無視する)。
+    - offsetを指定した場合はoffset+1話目からlimit話分。
+    - limitを省略した場合は目次1ページ分(TOC_PAGE_SIZE)とする。
+    - いずれも指定しない場合は全話(Noneを返却)。
+    """
+    if offset is None and limit is None and around is None:
+        return None
+    limit = limit or TOC_PAGE_SIZE
+    if around is not None:
+        # 末尾付近ではlimit話分になるよう範囲を前にずらす
+        start = max(0, min(around - 1 - limit // 2, total_episodes - limit))
+    else:
+        start = offset or 0
+    return start + 1, min(total_episodes, start + limit)
+
+
+async def get_novel_info(
+    db: AsyncSession,
+    ncode: str,
+    user_id: int,
+    offset: Optional[int] = None,
+    limit: Optional[int] = None,
+    around: Optional[int] = None,
+):
     """指定されたncodeに基づいて小説の情報を取得し、それをレスポンスモデルに設定する関数.
 
+    offset・limit・aroundのいずれかを指定した場合、目次は指定した範囲の話のみを返却する
+    (範囲の計算はget_toc_windowを参照)。
+
     Parameters:
     - db (AsyncSession): 非同期SQLAlchemyセッション。データベースとの非同期通信。
     - ncode (str): 検索対象の小説コード。
+    - offset (Optional[int]): 目次の取得開始位置。
+    - limit (Optional[int]): 目次の取得件数。
+    - around (Optional[int]): 目次の範囲の中心とする話数。
 
     Returns:
     - NovelInfoResponse: 取得した小説情報を含むレスポンスモデルのインスタンス。
     """
-    payload = {
-        "of": "t-ga-w-gf-k-s-bg-g-gl",
-        "ncode": {ncode},
-        "lim": 1,
-        "out": "json",
-    }
-    response = request_get(Url.API_URL.value, payload=payload)
-    data = NarouData(response)
+    novel_data = await get_novel_data(ncode)
+    if novel_data is None:
+        raise ErrorHttpException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            error="invalid_parameter",
+            error_description="Nコードが存在しません。",
+        )
 
     # Bookテーブルからncodeに対応するbook_idを取得。
     book_id = await ensure_book_exists(db, ncode)
@@ -115,24 +420,43 @@ async def get_novel_info(db: AsyncSession, ncode: str, user_id: int):
     )
     # 非同期データベースクエリを実行してis_followを取得
     is_follow = await check_follow_exists_by_book_id(db, book_id, user_id)
-    # 指定されたncodeの小説の目次情報をスクレイピングで取得
-    chapters = scrape_narou_chapters(ncode, data.novel_data.general_all_no)
+    # 指定されたncodeの小説の目次情報を取得
+    window = get_toc_window(novel_data.general_all_no, offset, limit, around)
+    if window is None:
+        chapters = await load_chapters(db, book_id, ncode, novel_data)
+        toc_offset = 0
+    else:
+        first_episode, last_episode = window
+        chapters = []
+        if first_episode <= last_episode:
+            pages = await load_toc_pages(
+                db,
+                book_id,
+                ncode,
+                novel_data,
+                first_episode,
+                last_episode,
+            )
+            chapters = slice_chapters(pages, first_episode, last_episode)
+        toc_offset = first_episode - 1
 
     # APIレスポンスから小説データを抽出
-    novel_data = {
-        "title": data.novel_data.title,
-        "author": data.novel_data.writer,
-        "episode_count": data.novel_data.general_all_no,
-        "release_date": data.novel_data.general_firstup,
-        "tag": data.novel_data.keyword.split(" "),
-        "summary": data.novel_data.story,
-        "category": BigGenre.get_label_by_id(data.novel_data.biggenre),
-        "sub_category": Genre.get_label_by_id(data.novel_data.genre),
-        "updated_at": data.novel_data.general_lastup,
+    novel_info = {
+        "title": novel_data.title,
+        "author": novel_data.writer,
+        "episode_count": novel_data.general_all_no,
+        "release_date": novel_data.general_firstup,
+        "tag": novel_data.keyword.split(" "),
+        "summary": novel_data.story,
+        "category": BigGenre.get_label_by_id(novel_data.biggenre),
+        "sub_category": Genre.get_label_by_id(novel_data.genre),
+        "updated_at": novel_data.general_lastup,
         "read_episode": read_episode,
         "chapters": chapters,
+        "toc_offset": toc_offset,
+        "toc_count": sum(len(chapter["sub_titles"]) for chapter in chapters),
         "is_follow": is_follow,
     }
 
     # NovelInfoResponseモデルのインスタンスを作成して返す
-    return NovelInfoResponse(**novel_data)
+    return NovelInfoResponse(**novel_info)
@@ -0,0 +1,100 @@
+"""このモジュールは、HTML解析をプロセスプールで実行する機能を提供します.
+
+解析はCPU負荷の高い処理のため、イベントループのスレッドから別プロセスに逃がして
+他のリクエストの入出力処理を妨げないようにする。
+プロセス間ではレスポンスの本文(bytes)を渡し、解析結果(文字列・タプル)のみを受け取る。
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, List, Optional, Tuple, TypeVar
+
+from config.environment import parser_settings
+from domain.narou.parser import get_parser
+
+T = TypeVar("T")
+
+
+def parse_episode_content(
+    content: bytes, encoding: str
+) -> Tuple[Optional[str], Optional[str]]:
+    """本文ページの本文(bytes)からサブタイトルと本文のテキストを抽出する関数(プロセスで実行)."""
+    return get_parser().parse_episode(content.decode(encoding, "replace"))
+
+
+def parse_toc_content(content: bytes, encoding: str) -> List[Tuple[str, str]]:
+    """目次ページの本文(bytes)から章題とサブタイトルを抽出する関数(プロセスで実行)."""
+    return get_parser().parse_toc(content.decode(encoding, "replace"))
+
+
+class ParseExecutor:
+    """HTML解析を実行するプロセスプール.
+
+    起動していない場合(コマンドからの実行やworkers=0の場合)は呼び出し元で解析する。
+    依頼中の解析がmax_pendingに達した場合は空くまで待機する。
+    ワーカーの異常終了でプロセスプールが使えなくなった場合は起動し直す。
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        """初期化."""
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        # 起動済みのイベントループやDB接続を引き継がないようspawnで起動する
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    def start(self) -> None:
+        """プロセスプールを起動."""
+        if self.workers <= 0:
+            return
+        self._executor = self._create_executor()
+        self._semaphore = asyncio.Semaphore(self.max_pending)
+
+    async def shutdown(self) -> None:
+        """プロセスプールを停止."""
+        if self._executor is None:
+            return
+        executor, self._executor = self._executor, None
+        await asyncio.to_thread(executor.shutdown, cancel_futures=True)
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        """解析関数を実行して結果を返却."""
+        if self._executor is None:
+            return func(*args)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            for attempt in range(2):
+                executor = self._executor
+                try:
+                    return await loop.run_in_executor(executor, func, *args)
+                except BrokenProcessPool as exc:
+                    # ワーカーが異常終了した場合はプールを起動し直して1回だけ再実行する
+                    # (異常終了の原因のページを呼び出し元で解析しないようプールで実行)
+                    print(f"HTML解析のプロセスプールを再起動します: {exc}")
+                    self._restart(executor)
+                    if attempt > 0:
+                        raise
+
+    def _restart(self, broken: ProcessPoolExecutor) -> None:
+        """異常終了したプロセスプールを起動し直す.
+
+        他の呼び出しで起動し直した後や、停止した後の場合は何もしない。
+        """
+        if self._executor is not broken:
+            return
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._create_executor()
+
+
+parse_executor = ParseExecutor(
+    workers=parser_settings.PARSE_PROCESS_WORKERS,
+    max_pending=parser_settings.PARSE_MAX_PENDING,
+)
+"""HTML解析用のプロセスプール"""
@@ -0,0 +1,219 @@
+"""このモジュールは、小説家になろうのページ(本文・目次)のHTML解析機能を提供します.
+
+解析処理はパーサーごとのクラスに分け、HTML_PARSER_BACKENDで切り替える。
+- html.parser: BeautifulSoup(標準ライブラリのhtml.parser)
+- lxml: lxml(C実装のlibxml2)。インストールされていない場合はhtml.parserを使用する。
+"""
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from config.environment import parser_settings
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+LXML_AVAILABLE = lxml is not None
+"""lxmlがインストールされているかどうか"""
+
+CHAPTER = "chapter"
+"""目次の要素種別(章題)"""
+SUBTITLE = "subtitle"
+"""目次の要素種別(サブタイトル)"""
+
+
+def _has_class(name: str) -> str:
+    """class属性に指定したクラスを含む要素を選択するXPathの条件式."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+class HtmlParser(ABC):
+    """ページのHTML解析の基底クラス."""
+
+    name: str
+    """パーサー名"""
+
+    @abstractmethod
+    def parse_episode(self, html: str) -> Tuple[Optional[str], Optional[str]]:
+        """本文ページからサブタイトル(p.novel_subtitle)と本文(#novel_honbun)のテキストを抽出.
+
+        要素が存在しない場合はNoneとする。
+        """
+
+    @abstractmethod
+    def parse_toc(self, html: str) -> List[Tuple[str, str]]:
+        """目次ページ(.index_box)から章題とサブタイトルを出現順に抽出.
+
+        要素種別(CHAPTER/SUBTITLE)とテキストのタプルのリストを返す。
+        """
+
+
+class SoupParser(HtmlParser):
+    """BeautifulSoup(html.parser)による解析."""
+
+    name = "html.parser"
+
+    @staticmethod
+    def _is_episode_region(name: str, attrs: dict) -> bool:
+        """サブタイトル・本文の要素かどうか."""
+        if attrs.get("id") == "novel_honbun":
+            return True
+        return (
+            name == "p" and "novel_subtitle" in attrs.get("class", "").split()
+        )
+
+    def parse_episode(self, html: str) -> Tuple[Optional[str], Optional[str]]:
+        """本文ページからサブタイトルと本文のテキストを抽出.
+
+        サブタイトル・本文の要素(とその子孫)のみを木として構築する。
+        """
+        soup = BeautifulSoup(
+            html,
+            "html.parser",
+            parse_only=SoupStrainer(self._is_episode_region),
+        )
+        sub_title = soup.select_one("p.novel_subtitle")
+        honbun = soup.select_one("#novel_honbun")
+        return (
+            None if sub_title is None else sub_title.text,
+            None if honbun is None else honbun.text,
+        )
+
+    def parse_toc(self, html: str) -> List[Tuple[str, str]]:
+        """目次ページから章題とサブタイトルを出現順に抽出."""
+        soup = BeautifulSoup(html, "html.parser")
+        items = []
+        for child in soup.select(".index_box > *"):
+            if "chapter_title" in child.get("class", []):
+                items.append((CHAPTER, child.get_text(strip=True)))
+            elif "novel_sublist2" in child.get("class", []):
+                for sub in child.select(".subtitle"):
+                    text = sub.get_text(strip=True).replace("\n", "")
+                    items.append((SUBTITLE, text))
+        return items
+
+
+class LxmlParser(HtmlParser):
+    """lxmlによる解析.
+
+    テキストの抽出結果はSoupParserと一致させる。
+    BeautifulSoupと同様にコメント・ルビ(rt/rp)・script/style/templateのテキストは含めず、
+    get_text(strip=True)相当はテキストノードごとに前後の空白を除去して結合する。
+    """
+
+    name = "lxml"
+
+    _TOC_ITEMS = f"//*[{_has_class('index_box')}]/*"
+    _TOC_SUBTITLES = f".//*[{_has_class('subtitle')}]"
+    _EXCLUDED_TAGS = ("rt", "rp", "script", "style", "template")
+    """テキストに含めない要素"""
+    _FEED_CHUNK_SIZE = 16 * 1024
+    """逐次解析で1回に渡す文字数"""
+
+    @classmethod
+    def _texts(cls, element) -> List[str]:
+        # 解析結果の木は使い捨てのため、除外する要素をその場で取り除く
+        lxml.etree.strip_elements(element, *cls._EXCLUDED_TAGS, with_tail=False)
+        return element.xpath(".//text()")
+
+    @classmethod
+    def _text(cls, element) -> str:
+        return "".join(cls._texts(element))
+
+    @classmethod
+    def _stripped_text(cls, element) -> str:
+        return "".join(text.strip() for text in cls._texts(element))
+
+    @staticmethod
+    def _parse(html: str):
+        try:
+            return lxml.html.document_fromstring(html)
+        except lxml.etree.ParserError:
+            # 空のページなど解析できない場合は空の文書として扱う
+            return lxml.html.document_fromstring("<html></html>")
+
+    @staticmethod
+    def _is_episode_region(element) -> bool:
+        """サブタイトル・本文の要素かどうか."""
+        if element.get("id") == "novel_honbun":
+            return True
+        return element.tag == "p" and (
+            "novel_subtitle" in (element.get("class") or "").split()
+        )
+
+    def parse_episode(self, html: str) -> Tuple[Optional[str], Optional[str]]:
+        """本文ページからサブタイトルと本文のテキストを抽出.
+
+        逐次解析し、サブタイトル・本文の要素がどちらも閉じた時点で解析を打ち切る。
+        サブタイトル・本文以外の要素は閉じた時点で子要素を破棄して木を小さく保つ。
+        末尾まで渡しても閉じていない要素(途中で途切れたページなど)は、解析を終了して閉じる。
+        """
+        parser = lxml.etree.HTMLPullParser(events=("start", "end"))
+        found = {"sub_title": None, "honbun": None}
+        region = None
+
+        def read_events() -> bool:
+            nonlocal region
+            for event, element in parser.read_events():
+                if event == "start":
+                    if region is None and self._is_episode_region(element):
+                        region = element
+                    continue
+                if element is region:
+                    region = None
+                    key = (
+                        "honbun"
+                        if element.get("id") == "novel_honbun"
+                        else "sub_title"
+                    )
+                    if found[key] is None:
+                        found[key] = self._text(element)
+                    if None not in found.values():
+                        return True
+                elif region is not None:
+                    # サブタイトル・本文の子孫要素は残す
+                    continue
+                element.clear(keep_tail=True)
+            return False
+
+        for start in range(0, len(html), self._FEED_CHUNK_SIZE):
+            parser.feed(html[start : start + self._FEED_CHUNK_SIZE])
+            if read_events():
+                break
+        else:
+            try:
+                parser.close()
+            except lxml.etree.XMLSyntaxError:
+                # 空のページなど解析できない場合は要素なしとして扱う
+                pass
+            read_events()
+        return found["sub_title"], found["honbun"]
+
+    def parse_toc(self, html: str) -> List[Tuple[str, str]]:
+        """目次ページから章題とサブタイトルを出現順に抽出."""
+        root = self._parse(html)
+        items = []
+        for child in root.xpath(self._TOC_ITEMS):
+            classes = (child.get("class") or "").split()
+            if "chapter_title" in classes:
+                items.append((CHAPTER, self._stripped_text(child)))
+            elif "novel_sublist2" in classes:
+                for sub in child.xpath(self._TOC_SUBTITLES):
+                    text = self._stripped_text(sub).replace("\n", "")
+                    items.append((SUBTITLE, text))
+        return items
+
+
+PARSERS = {SoupParser.name: SoupParser, LxmlParser.name: LxmlParser}
+"""パーサー名と解析クラスの対応"""
+
+
+def get_parser(name: Optional[str] = None) -> HtmlParser:
+    """パーサーを返却(名前を省略した場合はHTML_PARSER_BACKENDの設定値)."""
+    name = name or parser_settings.HTML_PARSER_BACKEND
+    if name == LxmlParser.name and not LXML_AVAILABLE:
+        name = SoupParser.name
+    return PARSERS[name]()
@@ -0,0 +1,89 @@
+"""このモジュールは、本文の先読み(次話のバックグラウンド取得)の機能を提供します."""
+import asyncio
+from typing import List, Optional, Set, Tuple
+
+from config.config import SessionFactory
+from config.environment import cache_settings
+from crud import ensure_book_exists
+from domain.narou.main_text import is_episode_cached, load_episode
+from domain.narou.metadata import get_novel_data
+
+
+class EpisodePrefetcher:
+    """本文を先読みしてキャッシュに格納するクラス.
+
+    先読み待ちのキューには上限を設け、同じ話が重複して登録されないようにする。
+    """
+
+    def __init__(self, max_queue: int, workers: int):
+        """初期化."""
+        self.max_queue = max_queue
+        self.workers = workers
+        self._queue: Optional[asyncio.Queue] = None
+        self._pending: Set[Tuple[str, int]] = set()
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        """先読み用のワーカーを起動."""
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._tasks = [
+            asyncio.create_task(self._worker()) for _ in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """先読み用のワーカーを停止."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self._pending.clear()
+
+    async def schedule(self, ncode: str, episodes: List[int]) -> None:
+        """指定された話を先読み待ちに登録.
+
+        キャッシュ済み・登録済みの話は登録せず、キューが満杯の場合は破棄する。
+        """
+        if self._queue is None:
+            return
+        for episode in episodes:
+            key = (ncode, episode)
+            if key in self._pending or await is_episode_cached(ncode, episode):
+                continue
+            try:
+                self._queue.put_nowait(key)
+            except asyncio.QueueFull:
+                return
+            self._pending.add(key)
+
+    async def _worker(self) -> None:
+        while True:
+            ncode, episode = await self._queue.get()
+            try:
+                async_session = SessionFactory.create()
+                async with async_session() as db:
+                    book_id = await ensure_book_exists(db, ncode)
+                    await load_episode(db, book_id, ncode, episode)
+            except Exception as exc:
+                print(f"先読みに失敗しました: {ncode} {episode} {exc}")
+            finally:
+                self._pending.discard((ncode, episode))
+                self._queue.task_done()
+
+
+prefetcher = EpisodePrefetcher(
+    max_queue=cache_settings.PREFETCH_MAX_QUEUE,
+    workers=cache_settings.PREFETCH_WORKERS,
+)
+"""本文の先読み"""
+
+
+async def schedule_next_episodes(ncode: str, episode: int) -> None:
+    """指定された話の次話以降(PREFETCH_DEPTH話分)を先読み待ちに登録する関数."""
+    novel_data = await get_novel_data(ncode)
+    if novel_data is None:
+        return
+    last = min(
+        novel_data.general_all_no, episode + cache_settings.PREFETCH_DEPTH
+    )
+    await prefetcher.schedule(ncode, list(range(episode + 1, last + 1)))
@@ -2,16 +2,47 @@
 
 
 import time
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request, status
 from fastapi.exceptions import RequestValidationError
 from starlette.responses import JSONResponse
 
+from apis.cache import close_cache_backends
 from apis.exception import ErrorHttpException
+from apis.request import HttpClientFactory
 from config.config import setup_middlewares
+from config.environment import cache_settings
+from domain.narou.book_metadata import book_refresher
+from domain.narou.parse_executor import parse_executor
+from domain.narou.prefetch import prefetcher
 from routers import router
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """アプリケーションの起動時・終了時の処理.
+
+    外部通信用のHTTPクライアント(コネクションプール)とHTML解析用のプロセスプールを
+    起動時に生成し、終了時に解放する。
+    本文の先読み・小説情報の定期更新が有効な場合はそれぞれ起動・停止する。
+    終了時にはキャッシュの保存先との接続も解放する。
+    """
+    HttpClientFactory.create()
+    parse_executor.start()
+    if cache_settings.PREFETCH_ENABLED:
+        prefetcher.start()
+    if cache_settings.BOOK_REFRESH_ENABLED:
+        book_refresher.start()
+    yield
+    await book_refresher.stop()
+    await prefetcher.stop()
+    await HttpClientFactory.close()
+    await parse_executor.shutdown()
+    await close_cache_backends()
+
+
+app = FastAPI(lifespan=lifespan)
 """FastAPIのインスタンス"""
 
 setup_middlewares(app)
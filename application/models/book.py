@@ -1,7 +1,8 @@
 """このモジュールでは、小説情報を表現するためのデータベースモデルを提供します."""
+from datetime import datetime
+from typing import Optional
 
-
-from sqlalchemy import String
+from sqlalchemy import DateTime, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from models.base import Base
@@ -15,9 +16,29 @@ class Book(Base):
     ncode: Mapped[str] = mapped_column(
         String(255), nullable=False, unique=True, comment="小説コード"
     )
+    title: Mapped[Optional[str]] = mapped_column(
+        String(255), nullable=True, comment="小説のタイトル"
+    )
+    writer: Mapped[Optional[str]] = mapped_column(
+        String(255), nullable=True, comment="作者名"
+    )
+    episode_count: Mapped[Optional[int]] = mapped_column(
+        Integer, nullable=True, comment="全話数"
+    )
+    general_lastup: Mapped[Optional[str]] = mapped_column(
+        String(32), nullable=True, comment="最終掲載日"
+    )
+    metadata_refreshed_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+        index=True,
+        comment="小説情報(タイトル・作者名・全話数・最終掲載日)の更新日時",
+    )
 
     # Relationshipの定義
     read_history = relationship(
         "ReadHistory", back_populates="book", uselist=True
     )
     follow = relationship("Follow", back_populates="book", uselist=True)
+    episode = relationship("Episode", back_populates="book", uselist=True)
+    toc = relationship("Toc", back_populates="book", uselist=False)
@@ -0,0 +1,45 @@
+"""このモジュールは、取得済みの小説本文を保存するためのデータベースモデルを提供します."""
+from datetime import datetime
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    UniqueConstraint,
+    func,
+)
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from models.base import Base
+
+
+class Episode(Base):
+    """本文テーブルのORM."""
+
+    __tablename__ = "episode"
+    __table_args__ = (UniqueConstraint("book_id", "episode"),)
+
+    book_id = Column(String(26), ForeignKey("book.id"), nullable=False)
+    episode: Mapped[int] = mapped_column(Integer, nullable=False, comment="話数")
+    sub_title: Mapped[str] = mapped_column(
+        Text, nullable=False, comment="エピソードタイトル"
+    )
+    body: Mapped[bytes] = mapped_column(
+        LargeBinary, nullable=False, comment="本文(zlib圧縮)"
+    )
+    content_hash: Mapped[str] = mapped_column(
+        String(64), nullable=False, comment="本文のハッシュ値(SHA-256)"
+    )
+    fetched_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        comment="取得日時",
+    )
+
+    # Relationshipの定義
+    book = relationship("Book", back_populates="episode", uselist=False)
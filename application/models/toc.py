@@ -0,0 +1,36 @@
+"""このモジュールは、スクレイピングで取得した目次情報を保存するためのデータベースモデルを提供します."""
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from models.base import Base
+
+
+class Toc(Base):
+    """目次テーブルのORM."""
+
+    __tablename__ = "toc"
+
+    book_id = Column(
+        String(26), ForeignKey("book.id"), nullable=False, unique=True
+    )
+    episode_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, comment="目次を取得した時点の全話数"
+    )
+    general_lastup: Mapped[str] = mapped_column(
+        String(32), nullable=False, comment="目次を取得した時点の最終掲載日"
+    )
+    pages: Mapped[list] = mapped_column(
+        JSONB, nullable=False, comment="目次ページごとの章題・サブタイトル"
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        comment="更新日時",
+    )
+
+    # Relationshipの定義
+    book = relationship("Book", back_populates="toc", uselist=False)
@@ -1,20 +1,46 @@
 """ルーター用モジュール."""
 
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, status
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    Query,
+    Request,
+    status,
+)
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from apis.cache import get_cache_stats
+from apis.etag import etag_response
 from apis.exception import ErrorHttpException
+from apis.http_cache import get_http_cache_stats
 from apis.permmisions import check_access_token
 from apis.signature import verify_signature
+from apis.throttle import get_throttle_stats
 from config.config import get_async_session
-from domain.narou.follow import delete_follow, get_follow, post_follow
-from domain.narou.main_text import get_main_text
+from config.environment import cache_settings
+from domain.narou.follow import (
+    delete_follow,
+    get_follow,
+    get_new_episodes,
+    post_follow,
+)
+from domain.narou.main_text import get_main_text, stream_main_text
+from domain.narou.narou_data import get_narou_api_stats
 from domain.narou.novel_info import get_novel_info
+from domain.narou.prefetch import schedule_next_episodes
 from domain.user.auth import auth_password, auth_token
 from domain.user.user_registration import user_registration
-from schemas.follow import FollowModel, FollowResponse, GetFollowResponse
+from schemas.follow import (
+    FollowModel,
+    FollowResponse,
+    GetFollowResponse,
+    NewEpisodesResponse,
+)
+from schemas.metrics import MetricsResponse
 from schemas.novel import NovelInfoResponse, NovelResponse
 from schemas.token import AuthUserModel, AuthUserResponse, GrantType
 from schemas.user import UserRegistrationModel, UserRegistrationResponse
@@ -26,36 +52,84 @@ router = APIRouter()
     "/api/maintext",
     response_model=NovelResponse,
     summary="本文取得API",
-    description="指定されたNコードとエピソード番号から小説本文に関する情報を取得します。",
+    description="指定されたNコードとエピソード番号から小説本文に関する情報を取得します。"
+    "If-None-Matchが内容のETagと一致する場合は304を返却します。",
     tags=["小説表示画面"],
 )
 async def main_text(
     *,
+    request: Request,
     ncode: str,
     episode: int,
+    background_tasks: BackgroundTasks,
     async_session: AsyncSession = Depends(get_async_session),
     signature=Depends(verify_signature),
     user_id: str = Depends(check_access_token),
 ):
     """小説取得APIのエンドポイント."""
-    return await get_main_text(ncode, episode, user_id, async_session)
+    novel = await get_main_text(ncode, episode, user_id, async_session)
+    if cache_settings.PREFETCH_ENABLED and novel.next:
+        # レスポンス送信後に次話を先読み
+        background_tasks.add_task(schedule_next_episodes, ncode, episode)
+    return etag_response(request, novel)
+
+
+@router.get(
+    "/api/maintext/stream",
+    response_class=StreamingResponse,
+    summary="本文取得API(ストリーミング)",
+    description="指定されたNコードとエピソード番号から小説本文をNDJSON形式で逐次返却します。"
+    "1行目はヘッダー(type=header: title, sub_title, prev, next)、"
+    "以降は本文の1行ずつ(type=paragraph: text)です。"
+    "本文がキャッシュ・DBに無い場合、1行目はなろうからの取得と解析の完了後に返却します"
+    "(取得した本文の保存は送信後に行います)。",
+    tags=["小説表示画面"],
+)
+async def main_text_stream(
+    *,
+    ncode: str,
+    episode: int,
+    background_tasks: BackgroundTasks,
+    async_session: AsyncSession = Depends(get_async_session),
+    signature=Depends(verify_signature),
+    user_id: str = Depends(check_access_token),
+):
+    """小説取得API(ストリーミング)のエンドポイント."""
+    content, has_next = await stream_main_text(
+        ncode, episode, user_id, async_session
+    )
+    if cache_settings.PREFETCH_ENABLED and has_next:
+        # レスポンス送信後に次話を先読み
+        background_tasks.add_task(schedule_next_episodes, ncode, episode)
+    return StreamingResponse(content, media_type="application/x-ndjson")
 
 
 @router.get(
     "/api/novelinfo",
     response_model=NovelInfoResponse,
     summary="小説情報取得API",
-    description="指定されたNコードから目次ページに関する情報を取得します。",
+    description="指定されたNコードから目次ページに関する情報を取得します。"
+    "offset・limit・aroundを指定した場合、目次は指定した範囲の話のみを返却します。"
+    "If-None-Matchが内容のETagと一致する場合は304を返却します。",
     tags=["目次画面"],
 )
 async def novel_info(
+    request: Request,
     ncode: str,
+    offset: Optional[int] = Query(None, ge=0, description="目次の取得開始位置"),
+    limit: Optional[int] = Query(
+        None, ge=1, le=1000, description="目次の取得件数(省略時は100)"
+    ),
+    around: Optional[int] = Query(
+        None, ge=1, description="目次の範囲の中心とする話数(offsetより優先)"
+    ),
     db: AsyncSession = Depends(get_async_session),
     signature=Depends(verify_signature),
     user_id: str = Depends(check_access_token),
 ):
     """小説情報取得APIのエンドポイント."""
-    return await get_novel_info(db, ncode, user_id)
+    novel = await get_novel_info(db, ncode, user_id, offset, limit, around)
+    return etag_response(request, novel)
 
 
 @router.get(
@@ -74,6 +148,24 @@ async def get_follow_router(
     return await get_follow(db, user_id)
 
 
+@router.get(
+    "/api/follow/new_episodes",
+    response_model=NewEpisodesResponse,
+    summary="新着話取得API",
+    description="ログインユーザーのお気に入り小説のうち、既読話数より全話数が多いものを最終掲載日の新しい順に取得",
+    tags=["お気に入り"],
+)
+async def get_new_episodes_router(
+    limit: int = Query(20, ge=1, le=100, description="取得件数"),
+    offset: int = Query(0, ge=0, description="取得開始位置"),
+    db: AsyncSession = Depends(get_async_session),
+    signature=Depends(verify_signature),
+    user_id: str = Depends(check_access_token),
+):
+    """新着話取得APIのエンドポイント."""
+    return await get_new_episodes(db, user_id, limit, offset)
+
+
 @router.post(
     "/api/follow",
     response_model=FollowResponse,
@@ -169,3 +261,20 @@ async def user_resistration_router(
     """ユーザー登録APIのエンドポイント."""
     is_success = await user_registration(db, user_data)
     return UserRegistrationResponse(is_success=is_success)
+
+
+@router.get(
+    "/api/metrics",
+    response_model=MetricsResponse,
+    summary="メトリクス取得API",
+    description="外部通信の待機状況・キャッシュの利用状況など、APIサーバーのメトリクスを取得します。",
+    tags=["運用"],
+)
+async def metrics_router(signature=Depends(verify_signature)):
+    """メトリクス取得APIのエンドポイント."""
+    return MetricsResponse(
+        upstream=get_throttle_stats(),
+        http_cache=get_http_cache_stats(),
+        cache=get_cache_stats(),
+        narou_api=get_narou_api_stats(),
+    )
@@ -1,4 +1,6 @@
 """このモジュールは、お気に入り関連の操作に関するレスポンスモデルを定義しています."""
+from typing import List, Optional
+
 from pydantic import BaseModel, Field
 
 
@@ -42,6 +44,7 @@ class GetFollowResponse(BaseModel):
     ncode: str
     title: str
     author: str
+    episode_count: int
     read_episode: int
 
     class Config:
@@ -57,6 +60,51 @@ class GetFollowResponse(BaseModel):
                 "ncode": "xxxx",
                 "title": "小説名",
                 "author": "作者名",
+                "episode_count": 120,
                 "read_episode": 10,
             }
         }
+
+
+class NewEpisodeItem(BaseModel):
+    """新着話のあるお気に入り小説."""
+
+    ncode: str = Field(..., title="小説コード")
+    title: str = Field(..., title="小説のタイトル")
+    author: str = Field(..., title="作者名")
+    episode_count: int = Field(..., title="全話数")
+    read_episode: int = Field(..., title="既読した話数(未読の場合は0)")
+    unread_count: int = Field(..., title="未読の話数")
+    updated_at: Optional[str] = Field(None, title="最終掲載日")
+
+
+class NewEpisodesResponse(BaseModel):
+    """新着話取得APIのレスポンスモデル."""
+
+    total: int = Field(..., title="新着話のあるお気に入り小説の総数")
+    items: List[NewEpisodeItem] = Field(..., title="新着話のあるお気に入り小説")
+
+    class Config:
+        """Pydanticモデルの設定クラス.
+
+        json_schema_extra: スキーマの例を定義します。
+                        この例はAPIのドキュメントで使用され、
+                        APIの使用方法を理解しやすくするために役立ちます。
+        """
+
+        json_schema_extra = {
+            "example": {
+                "total": 1,
+                "items": [
+                    {
+                        "ncode": "xxxx",
+                        "title": "小説名",
+                        "author": "作者名",
+                        "episode_count": 120,
+                        "read_episode": 110,
+                        "unread_count": 10,
+                        "updated_at": "2024-01-01 00:00:00",
+                    }
+                ],
+            }
+        }
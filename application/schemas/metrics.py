@@ -0,0 +1,60 @@
+"""メトリクス取得API関連のスキーマ用モジュール."""
+from typing import Dict
+
+from pydantic import BaseModel, Field
+
+
+class MetricsResponse(BaseModel):
+    """メトリクス取得APIのレスポンスモデル.
+
+    値はいずれもAPIサーバーのプロセスの起動時からの累計(現在値を含む)。
+    """
+
+    upstream: Dict[str, dict] = Field(..., title="接続先ホストごとの流量制御の待機状況")
+    http_cache: dict = Field(..., title="条件付きGET用のHTTPキャッシュの利用状況")
+    cache: Dict[str, dict] = Field(..., title="キャッシュの名前空間ごとの利用状況")
+    narou_api: dict = Field(..., title="なろうAPIのレスポンスサイズ")
+
+    class Config:
+        """Pydanticモデルの設定クラス.
+
+        json_schema_extra: スキーマの例を定義します。
+                        この例はAPIのドキュメントで使用され、
+                        APIの使用方法を理解しやすくするために役立ちます。
+        """
+
+        json_schema_extra = {
+            "example": {
+                "upstream": {
+                    "ncode.syosetu.com": {
+                        "requests": 120,
+                        "waited": 8,
+                        "total_wait_seconds": 1.6,
+                        "max_wait_seconds": 0.4,
+                        "queued": 0,
+                        "in_flight": 1,
+                    }
+                },
+                "http_cache": {
+                    "revalidations": 40,
+                    "not_modified": 35,
+                    "stores": 12,
+                    "evictions": 0,
+                    "bytes_saved": 3500000,
+                },
+                "cache": {
+                    "episode": {
+                        "hits": 90,
+                        "misses": 10,
+                        "errors": 0,
+                        "hit_ratio": 0.9,
+                    }
+                },
+                "narou_api": {
+                    "responses": 30,
+                    "wire_bytes": 4000,
+                    "decoded_bytes": 12000,
+                    "bytes_saved": 8000,
+                },
+            }
+        }
@@ -74,6 +74,8 @@ class NovelInfoResponse(BaseModel):
     updated_at : 作品の最終更新日
     read_episode : 既読した話数
     chapters : 章
+    toc_offset : 目次の開始位置
+    toc_count : 目次に含まれる話数
     is_follow : お気に入り登録してるかどうか
     """
 
@@ -88,6 +90,8 @@ class NovelInfoResponse(BaseModel):
     updated_at: str = Field(..., title="作品の最終更新日")
     read_episode: int = Field(..., title="既読した話数")
     chapters: List[Chapter] = Field(..., title="章")
+    toc_offset: int = Field(0, title="目次の開始位置(最初の話数-1)")
+    toc_count: int = Field(0, title="目次に含まれる話数")
     is_follow: bool = Field(..., title="お気に入り登録してるかどうか")
 
     class Config:
@@ -116,6 +120,8 @@ class NovelInfoResponse(BaseModel):
                         "sub_titles": ["第一話：異世界への扉", "第二話：新たなる出会い"],
                     }
                 ],
+                "toc_offset": 0,
+                "toc_count": 2,
                 "is_follow": True,
             }
         }
@@ -0,0 +1,186 @@
+"""キャッシュのバックエンドのテスト.
+
+RedisBackendは、テスト内で起動する最小限のRESPサーバー(Redisの代替)に対して検証する。
+"""
+import asyncio
+import time
+
+import pytest
+
+from apis.cache import CacheNamespace, RedisBackend, RedisError
+
+
+class RespServer:
+    """GET/SET(PX)/EXISTS/DEL/AUTH/SELECTのみに対応したRESPサーバー."""
+
+    def __init__(self, password=None):
+        """初期化."""
+        self.password = password
+        self.store = {}
+        self.connections = 0
+        self._server = None
+
+    @property
+    def url(self):
+        """接続先のURL."""
+        port = self._server.sockets[0].getsockname()[1]
+        auth = f":{self.password}@" if self.password else ""
+        return f"redis://{auth}127.0.0.1:{port}/1"
+
+    async def __aenter__(self):
+        """サーバーを起動."""
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        """サーバーを停止."""
+        self._server.close()
+        await self._server.wait_closed()
+
+    @staticmethod
+    async def _read_command(reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int((await reader.readline())[1:-2])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    def _get(self, key):
+        value, expires_at = self.store.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.store[key]
+            return None
+        return value
+
+    def _reply(self, command, args, authenticated):
+        if command == b"AUTH":
+            if args[0].decode() != self.password:
+                return b"-WRONGPASS invalid password\r\n", False
+            return b"+OK\r\n", True
+        if self.password and not authenticated:
+            return b"-NOAUTH Authentication required.\r\n", False
+        if command == b"SELECT":
+            return b"+OK\r\n", authenticated
+        if command == b"SET":
+            key, value, _, px = args
+            self.store[key] = (value, time.monotonic() + int(px) / 1000)
+            return b"+OK\r\n", authenticated
+        if command == b"GET":
+            value = self._get(args[0])
+            if value is None:
+                return b"$-1\r\n", authenticated
+            return b"$%d\r\n%s\r\n" % (len(value), value), authenticated
+        if command == b"EXISTS":
+            return b":%d\r\n" % (self._get(args[0]) is not None), authenticated
+        if command == b"DEL":
+            deleted = self.store.pop(args[0], None) is not None
+            return b":%d\r\n" % deleted, authenticated
+        return b"-ERR unknown command\r\n", authenticated
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        authenticated = False
+        while (command := await self._read_command(reader)) is not None:
+            reply, authenticated = self._reply(
+                command[0].upper(), command[1:], authenticated
+            )
+            writer.write(reply)
+            await writer.drain()
+        writer.close()
+
+
+def test_redis_backend_commands():
+    """値の設定・取得・存在確認・削除ができること."""
+
+    async def scenario():
+        async with RespServer() as server:
+            backend = RedisBackend(server.url, pool_size=2, timeout=1.0)
+            value = "日本語\r\n$-1\r\n".encode()
+            await backend.set("key", value, ttl=10)
+
+            assert await backend.get("key") == value
+            assert await backend.exists("key")
+            assert await backend.get("missing") is None
+            assert not await backend.exists("missing")
+
+            await backend.delete("key")
+            assert await backend.get("key") is None
+            await backend.close()
+
+    asyncio.run(scenario())
+
+
+def test_redis_backend_expiry():
+    """有効期限(PX)を過ぎた値は取得できないこと."""
+
+    async def scenario():
+        async with RespServer() as server:
+            backend = RedisBackend(server.url, pool_size=1, timeout=1.0)
+            await backend.set("key", b"value", ttl=0.05)
+            assert await backend.get("key") == b"value"
+
+            await asyncio.sleep(0.1)
+            assert await backend.get("key") is None
+            await backend.close()
+
+    asyncio.run(scenario())
+
+
+def test_redis_backend_reuses_connections():
+    """同時接続数がpool_sizeまでに抑えられ、接続が再利用されること."""
+
+    async def scenario():
+        async with RespServer() as server:
+            backend = RedisBackend(server.url, pool_size=2, timeout=1.0)
+            await asyncio.gather(
+                *(backend.set(f"key{i}", b"value", ttl=10) for i in range(20))
+            )
+            await backend.get("key0")
+
+            assert server.connections <= 2
+            await backend.close()
+
+    asyncio.run(scenario())
+
+
+def test_redis_backend_auth():
+    """URLのパスワードで認証し、誤っている場合はRedisErrorとなること."""
+
+    async def scenario():
+        async with RespServer(password="secret") as server:
+            backend = RedisBackend(server.url, pool_size=1, timeout=1.0)
+            await backend.set("key", b"value", ttl=10)
+            assert await backend.get("key") == b"value"
+            await backend.close()
+
+            wrong = RedisBackend(
+                server.url.replace("secret", "wrong"), pool_size=1, timeout=1.0
+            )
+            with pytest.raises(RedisError):
+                await wrong.get("key")
+
+    asyncio.run(scenario())
+
+
+def test_cache_namespace_with_redis_backend():
+    """名前空間の値がRESPサーバーに保存され、通信に失敗した場合はミスとなること."""
+
+    async def scenario():
+        cache = CacheNamespace("test_redis", ttl=10, maxsize=10)
+        async with RespServer() as server:
+            cache._backend = RedisBackend(server.url, pool_size=1, timeout=1.0)
+            await cache.set("key", {"value": [1, "二"]})
+
+            assert await cache.get("key") == {"value": [1, "二"]}
+            assert cache.stats.hits == 1
+            await cache._backend.close()
+
+        # サーバー停止後はキャッシュに無いものとして扱う
+        assert await cache.get("key") is None
+        assert not await cache.exists("key")
+        assert cache.stats.errors == 2
+
+    asyncio.run(scenario())
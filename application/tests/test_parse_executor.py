@@ -0,0 +1,51 @@
+"""HTML解析用のプロセスプールのテスト."""
+import asyncio
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from domain.narou.parse_executor import ParseExecutor
+
+
+def _crash(marker):
+    """初回(目印のファイルが無い場合)のみワーカーを異常終了させる."""
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    return os.getpid()
+
+
+def _always_crash():
+    os._exit(1)
+
+
+def test_run_restarts_broken_pool(tmp_path):
+    """ワーカーが異常終了しても、プールを起動し直して再実行すること."""
+
+    async def scenario():
+        executor = ParseExecutor(workers=1, max_pending=4)
+        executor.start()
+        try:
+            pid = await executor.run(_crash, str(tmp_path / "crashed"))
+            assert pid != os.getpid()
+        finally:
+            await executor.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_run_recovers_after_repeated_crash():
+    """再実行でも異常終了した場合はエラーとし、以降の解析はできること."""
+
+    async def scenario():
+        executor = ParseExecutor(workers=1, max_pending=4)
+        executor.start()
+        try:
+            with pytest.raises(BrokenProcessPool):
+                await executor.run(_always_crash)
+            assert await executor.run(os.getpid) != os.getpid()
+        finally:
+            await executor.shutdown()
+
+    asyncio.run(scenario())
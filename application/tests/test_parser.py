@@ -0,0 +1,130 @@
+"""HTMLパーサー(html.parser/lxml)の解析結果のテスト."""
+import pytest
+
+from domain.narou.parser import (
+    CHAPTER,
+    LXML_AVAILABLE,
+    SUBTITLE,
+    LxmlParser,
+    SoupParser,
+    get_parser,
+)
+
+requires_lxml = pytest.mark.skipif(
+    not LXML_AVAILABLE, reason="lxmlがインストールされていない"
+)
+
+PARSERS = [
+    pytest.param(SoupParser, id="html.parser"),
+    pytest.param(LxmlParser, id="lxml", marks=requires_lxml),
+]
+
+EPISODE_HTML = """<!DOCTYPE html>
+<html><head><title>t</title><script>var x = "<p>";</script></head>
+<body>
+<div class="contents1"><a href="/n0000aa/">小説名</a></div>
+<p class="novel_subtitle">第1話　<ruby>漢字<rp>(</rp><rt>かんじ</rt><rp
+>)</rp></ruby>の話</p>
+<div id="novel_honbun" class="novel_view">
+<p id="L1">一行目&amp;記号&lt;&gt;</p>
+<p id="L2"><br></p>
+<p id="L3">二行目<!-- コメント -->の<ruby>続<rt>つづ</rt></ruby>き<br>改行</p>
+<style>.x {}</style>
+</div>
+<div id="novel_a">あとがき</div>
+</body></html>
+"""
+
+TOC_HTML = """<!DOCTYPE html>
+<html><body>
+<div class="index_box  top">
+<div class="chapter_title extra">　第一章　<ruby>始<rt>はじ</rt></ruby>まり　</div>
+<dl class="novel_sublist2 row">
+<dd class="subtitle"><a href="/n0000aa/1/">第1話
+　出会い&amp;別れ</a></dd>
+<dt class="long_update">2024/01/01</dt>
+</dl>
+<dl class="novel_sublist2"><dd class="subtitle pick"
+><a href="/n0000aa/2/">第2話<!-- c --></a></dd></dl>
+<div class="chapter_title">第二章</div>
+<dl class="novel_sublist2"><dd class="subtitle"><a href="/n0000aa/3/">第3話</a></dd></dl>
+</div>
+<div class="index_box_other"><div class="chapter_title">対象外</div></div>
+</body></html>
+"""
+
+
+@pytest.mark.parametrize("parser", PARSERS)
+def test_parse_episode(parser):
+    """ルビ・コメント・文字参照・改行を含む本文ページを解析できること."""
+    sub_title, honbun = parser().parse_episode(EPISODE_HTML)
+
+    assert sub_title == "第1話　漢字の話"
+    assert honbun.split("\n") == [
+        "",
+        "一行目&記号<>",
+        "",
+        "二行目の続き改行",
+        "",
+        "",
+    ]
+
+
+@pytest.mark.parametrize("parser", PARSERS)
+def test_parse_episode_without_regions(parser):
+    """サブタイトル・本文が無いページはNoneを返すこと."""
+    assert parser().parse_episode("<html><body><p>x</p></body></html>") == (
+        None,
+        None,
+    )
+    assert parser().parse_episode("") == (None, None)
+
+
+@pytest.mark.parametrize("parser", PARSERS)
+@pytest.mark.parametrize(
+    "html",
+    [
+        pytest.param(
+            '<html><body><div id="novel_honbun"><p>本文</p></div>'
+            '<p class="novel_subtitle">題</p></body></html>',
+            id="subtitle_after_honbun",
+        ),
+        pytest.param(
+            '<html><body><p class="novel_subtitle">題</p>'
+            '<div id="novel_honbun"><p>本文</p>',
+            id="truncated",
+        ),
+    ],
+)
+def test_parse_episode_irregular_page(parser, html):
+    """サブタイトルが本文の後にある・本文が閉じていないページも解析できること."""
+    assert parser().parse_episode(html) == ("題", "本文")
+
+
+@pytest.mark.parametrize("parser", PARSERS)
+def test_parse_toc(parser):
+    """複数クラスを持つ要素を含む目次ページから章題とサブタイトルを抽出できること."""
+    assert parser().parse_toc(TOC_HTML) == [
+        (CHAPTER, "第一章始まり"),
+        (SUBTITLE, "第1話　出会い&別れ"),
+        (SUBTITLE, "第2話"),
+        (CHAPTER, "第二章"),
+        (SUBTITLE, "第3話"),
+    ]
+
+
+@requires_lxml
+@pytest.mark.parametrize("html", [EPISODE_HTML, TOC_HTML])
+def test_lxml_matches_html_parser(html):
+    """lxmlの解析結果がhtml.parserと一致すること."""
+    soup, lxml = SoupParser(), LxmlParser()
+
+    assert lxml.parse_episode(html) == soup.parse_episode(html)
+    assert lxml.parse_toc(html) == soup.parse_toc(html)
+
+
+def test_get_parser():
+    """パーサー名に対応する解析クラスを返すこと."""
+    assert isinstance(get_parser("html.parser"), SoupParser)
+    if LXML_AVAILABLE:
+        assert isinstance(get_parser("lxml"), LxmlParser)
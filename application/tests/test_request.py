@@ -0,0 +1,136 @@
+"""外部通信(request_get)のテスト.
+
+httpx.MockTransportで小説家になろうの応答を差し替えて検証する。
+"""
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from apis import request as request_module
+from apis.http_cache import HttpCache
+from apis.request import HttpClientFactory, request_get
+from apis.resilience import get_circuit_breaker
+
+
+@pytest.fixture
+def mock_upstream(monkeypatch):
+    """応答を返す関数を受け取り、共有クライアントの通信先を差し替える."""
+    monkeypatch.setattr(request_module, "backoff_delay", lambda *args: 0)
+
+    def install(handler):
+        client = httpx.AsyncClient(
+            transport=httpx.MockTransport(handler), follow_redirects=True
+        )
+        monkeypatch.setattr(HttpClientFactory, "_client", client)
+        return client
+
+    return install
+
+
+def _open_breaker(url):
+    """遮断した上で、試行(half-open)が可能な時刻まで進めたブレーカーを返す."""
+    breaker = get_circuit_breaker(url)
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    breaker._opened_at = time.monotonic() - breaker.reset_seconds
+    return breaker
+
+
+def test_half_open_trial_released_after_redirect_loop(mock_upstream):
+    """試行がリダイレクトの上限超過で終わっても、遮断が解除できること."""
+    url = "https://redirect-loop.test/novel"
+    breaker = _open_breaker(url)
+    redirecting = True
+
+    def handler(request):
+        if redirecting:
+            return httpx.Response(302, headers={"location": url})
+        return httpx.Response(200, text="ok")
+
+    async def scenario():
+        nonlocal redirecting
+        client = mock_upstream(handler)
+        assert await request_get(url) is None
+        assert not breaker._trial
+
+        redirecting = False
+        response = await request_get(url)
+        assert response is not None and response.text == "ok"
+        assert not breaker.is_open
+        await client.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_half_open_trial_released_after_cancel(mock_upstream):
+    """試行がキャンセルされても、次の試行が許可されること."""
+    url = "https://cancelled.test/novel"
+    breaker = _open_breaker(url)
+
+    async def handler(request):
+        await asyncio.sleep(10)
+        return httpx.Response(200, text="ok")
+
+    async def scenario():
+        client = mock_upstream(handler)
+        task = asyncio.create_task(request_get(url))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert breaker.allow()
+        await client.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_not_modified_after_eviction_refetches(mock_upstream, monkeypatch):
+    """304の受信までに保持していた本文が破棄された場合、条件なしで取得し直すこと."""
+    url = "https://evicted.test/novel"
+    cache = HttpCache(max_bytes=1024)
+    monkeypatch.setattr(request_module, "http_cache", cache)
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if "if-none-match" in request.headers:
+            # 再検証中に他のレスポンスの保持によって破棄される
+            cache._discard(url)
+            return httpx.Response(304, headers={"etag": '"v1"'})
+        return httpx.Response(200, headers={"etag": '"v1"'}, text="body")
+
+    async def scenario():
+        client = mock_upstream(handler)
+        assert (await request_get(url)).text == "body"
+
+        response = await request_get(url)
+        assert response is not None and response.text == "body"
+        assert [r.headers.get("if-none-match") for r in requests] == [
+            None,
+            '"v1"',
+            None,
+        ]
+        await client.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_conditional_headers_refresh_lru_position():
+    """再検証するエントリは、他のエントリの保持で先に破棄されないこと."""
+    cache = HttpCache(max_bytes=8)
+    for key in ("a", "b"):
+        cache.store(
+            key,
+            httpx.Response(200, headers={"etag": f'"{key}"'}, content=b"1234"),
+        )
+
+    assert cache.conditional_headers("a") == {"If-None-Match": '"a"'}
+    cache.store(
+        "c", httpx.Response(200, headers={"etag": '"c"'}, content=b"1234")
+    )
+
+    assert cache.conditional_headers("a")
+    assert not cache.conditional_headers("b")